@@ -1,8 +1,20 @@
+import time
+_STARTED = time.perf_counter()
+
+import argparse
+import logging
+import subprocess
+import sys
 import tkinter as tk
 from tkinter import ttk
-from datetime import date, datetime
-from db import init_db, get_session, close_session
-from db.models import Transaction, Budget
+from datetime import datetime
+from db import init_db, get_session, close_session, enable_query_stats
+from db.events import EventBus
+from db.instrument import instrumented, stats as query_stats, logger as query_logger
+from db.rollups import status_totals
+from db.recurring import materialize
+from db.money import format_cents
+from utils.worker import QueryWorker
 from tabs.categories_tab import CategoriesTab
 from tabs.accounts_tab import AccountsTab
 from tabs.transactions_tab import TransactionsTab
@@ -10,14 +22,30 @@ from tabs.budgets_tab import BudgetsTab
 
 
 class MainWindow(tk.Tk):
-    def __init__(self):
+    # (attribute, title, class) of each notebook tab, in display order
+    TABS = [
+        ("tx_tab", "Transactions", TransactionsTab),
+        ("bd_tab", "Budgets", BudgetsTab),
+        ("cat_tab", "Categories", CategoriesTab),
+        ("acc_tab", "Accounts", AccountsTab),
+    ]
+
+    def __init__(self, lazy_tabs=True, query_log_interval=None):
         super().__init__()
+        self.lazy_tabs = lazy_tabs
+        # Seconds between query statistics log dumps; set (with enable_query_stats) to show the developer readout
+        self.query_log_interval = query_log_interval
         self.title("Personal Budgeting Application")
         self.geometry("1000x650")
 
         # Initialize database
         init_db()
         self.session = get_session()
+        # Planned entries for recurring rules, through the horizon; nothing to write on most startups
+        materialize(self.session)
+        self.events = EventBus()
+        self.worker = QueryWorker(self)
+        self._dirty_tabs = set()
 
         self._build_ui()
         self.update_status_bar()
@@ -26,79 +54,140 @@ class MainWindow(tk.Tk):
         self.protocol("WM_DELETE_WINDOW", self.on_closing)
 
     def _build_ui(self):
-        # Tabs
+        # Tabs. In lazy mode each tab starts as an empty page and is built (and loads its data) when first shown.
         nb = ttk.Notebook(self)
-        self.tx_tab = TransactionsTab(nb, self)
-        self.bd_tab = BudgetsTab(nb, self)
-        self.cat_tab = CategoriesTab(nb, self)
-        self.acc_tab = AccountsTab(nb, self)
-        nb.add(self.tx_tab, text="Transactions")
-        nb.add(self.bd_tab, text="Budgets")
-        nb.add(self.cat_tab, text="Categories")
-        nb.add(self.acc_tab, text="Accounts")
+        self.nb = nb
+        self._unbuilt_pages = {}  # page path -> (attribute, tab class)
+        for attr, title, tab_class in self.TABS:
+            if self.lazy_tabs:
+                page = ttk.Frame(nb)
+                self._unbuilt_pages[str(page)] = (attr, tab_class)
+                setattr(self, attr, None)
+            else:
+                page = tab_class(nb, self)
+                setattr(self, attr, page)
+            nb.add(page, text=title)
         nb.pack(fill="both", expand=True)
+        nb.bind("<<NotebookTabChanged>>", self._on_tab_changed)
+        self._build_page(nb.select())
 
         # Status bar
         self.status = ttk.Label(self, text="Month Spend: $0.00 | Planned: $0.00 | Alarms: 0", anchor="w")
         self.status.pack(fill="x", side="bottom")
+        self.events.subscribe("transaction", lambda e: self.update_status_bar())
+        self.events.subscribe("budget", lambda e: self.update_status_bar())
+
+        # Developer readout of SQL statement counts and timings
+        if self.query_log_interval:
+            self.query_status = ttk.Label(self, anchor="w", foreground="gray40")
+            self.query_status.pack(fill="x", side="bottom")
+            self.after(1000, self._show_query_stats)
+            self.after(int(self.query_log_interval * 1000), self._log_query_stats)
 
+    @instrumented
     def update_status_bar(self):
-        """Update status bar with current month spend, planned amount, and alarms."""
-        try:
-            now = datetime.now()
-            current_month = now.month
-            current_year = now.year
-
-            # Calculate month spend (posted transactions only)
-            posted_transactions = self.session.query(Transaction).filter(
-                Transaction.date >= date(current_year, current_month, 1),
-                Transaction.date < date(
-                    current_year, current_month + 1, 1) if current_month < 12 else date(current_year + 1, 1, 1),
-                Transaction.planned == False
-            ).all()
-
-            month_spend = sum(float(t.amount) for t in posted_transactions)
-
-            # Calculate planned amount
-            planned_transactions = self.session.query(Transaction).filter(Transaction.planned == True).all()
-
-            planned_total = sum(float(t.amount) for t in planned_transactions)
-
-            # Count alarms
-            budgets = self.session.query(Budget).filter(Budget.month == current_month, Budget.year == current_year).all()
-
-            alarms = 0
-            for budget in budgets:
-                # Calculate spent for this category in this month
-                transactions = self.session.query(Transaction).filter(
-                    Transaction.category_id == budget.category_id,
-                    Transaction.date >= date(budget.year, budget.month, 1),
-                    Transaction.date < date(
-                        budget.year, budget.month + 1, 1) if budget.month < 12 else date(budget.year + 1, 1, 1),
-                    Transaction.planned == False
-                ).all()
-
-                spent = sum(float(t.amount) for t in transactions)
-                if spent > float(budget.target_amount):
-                    alarms += 1
-
-            self.status.config(text=f"Month Spend: ${month_spend:,.2f} | Planned: ${planned_total:,.2f} | Alarms: {alarms}")
-        except Exception as e:
-            self.status.config(text=f"Error updating status: {str(e)}")
-
-    def refresh_all_tabs(self):
-        """Refresh all tabs when data changes."""
-        self.cat_tab.load_data()
-        self.acc_tab.load_data()
-        self.tx_tab.load_data()
-        self.bd_tab.load_data()
-        self.update_status_bar()
+        """Update status bar with current month spend, planned amount, and alarms (queried on the worker)."""
+        now = datetime.now()
+        current_month = now.month
+        current_year = now.year
+
+        # Month spend (posted only), all planned and budget alarms come from monthly_rollups
+        self.worker.submit("status.load", lambda session: status_totals(session, current_year, current_month),
+                           self._show_status, lambda e: self.status.config(text=f"Error updating status: {str(e)}"))
+
+    def _show_status(self, totals):
+        month_spend, planned_total, alarms = totals
+        self.status.config(text=f"Month Spend: {format_cents(month_spend, symbol=True)} | "
+                                f"Planned: {format_cents(planned_total, symbol=True)} | Alarms: {alarms}")
+
+    def _show_query_stats(self):
+        count, total_ms = query_stats.totals()
+        text = f"SQL: {count} statements, {total_ms:,.1f} ms"
+        last = query_stats.last_operation
+        for name, op_count, op_total, p95 in query_stats.summary():
+            if name == last:
+                text += f" | last: {name} ({op_count} statements, {op_total:,.1f} ms, p95 {p95:.2f} ms)"
+        self.query_status.config(text=text)
+        self.after(1000, self._show_query_stats)
+
+    def _log_query_stats(self, repeat=True):
+        query_logger.info("Query statistics:\n%s", query_stats.report())
+        if repeat:
+            self.after(int(self.query_log_interval * 1000), self._log_query_stats)
+
+    def _build_page(self, page):
+        """Construct a lazy tab inside its page the first time the page is selected."""
+        if page not in self._unbuilt_pages:
+            return
+        attr, tab_class = self._unbuilt_pages.pop(page)
+        tab = tab_class(self.nametowidget(page), self)
+        tab.pack(fill="both", expand=True)
+        setattr(self, attr, tab)
+
+    def _is_showing(self, tab):
+        # A lazily built tab lives inside its notebook page
+        return self.nb.select() in (str(tab), str(tab.master))
+
+    def notify(self, tab, apply):
+        """Apply a change to a tab right away if it is showing; otherwise reload it the next time it is shown."""
+        if self._is_showing(tab):
+            apply()
+        else:
+            self._dirty_tabs.add(tab)
+
+    def _on_tab_changed(self, _event):
+        """Build a tab on first view, or reload one that missed changes while it was hidden."""
+        self._build_page(self.nb.select())
+        for tab in list(self._dirty_tabs):
+            if self._is_showing(tab):
+                self._dirty_tabs.discard(tab)
+                tab.load_data()
+
+    def report_first_paint(self):
+        """Print the time from process start until the first window contents are drawn, then close."""
+        self.update_idletasks()
+        elapsed = (time.perf_counter() - _STARTED) * 1000
+        print(f"{elapsed:.1f}")
+        self.on_closing()
 
     def on_closing(self):
         """Handle window close event."""
+        if self.query_log_interval:
+            self._log_query_stats(repeat=False)
+        self.worker.shutdown()
         close_session()
         self.destroy()
 
 
+def startup_report():
+    """Time-to-first-paint with lazy and eager tab construction, each in a fresh process."""
+    for label, flags in (("lazy tabs", []), ("eager tabs", ["--eager-tabs"])):
+        result = subprocess.run([sys.executable, __file__, "--first-paint", *flags], capture_output=True, text=True, check=True)
+        print(f"Time to first paint ({label}): {float(result.stdout.strip().splitlines()[-1]):,.1f} ms")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Personal Budgeting Application")
+    parser.add_argument("--eager-tabs", action="store_true", help="build and load every tab at startup instead of on first view")
+    parser.add_argument("--startup-report", action="store_true", help="print time-to-first-paint with lazy and eager tabs, then exit")
+    parser.add_argument("--query-stats", type=float, nargs="?", const=60, metavar="SECONDS",
+                        help="show SQL counts/timings in the status bar and log them every SECONDS (default 60)")
+    parser.add_argument("--first-paint", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.startup_report:
+        startup_report()
+        return
+
+    if args.query_stats:
+        logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(message)s")
+        enable_query_stats()
+
+    window = MainWindow(lazy_tabs=not args.eager_tabs, query_log_interval=args.query_stats)
+    if args.first_paint:
+        window.after(0, window.report_first_paint)
+    window.mainloop()
+
+
 if __name__ == "__main__":
-    MainWindow().mainloop()
\ No newline at end of file
+    main()
\ No newline at end of file
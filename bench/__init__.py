@@ -0,0 +1 @@
+"""Synthetic data (`python -m bench.generate`) and load-path benchmarks (`python -m bench.run`)."""
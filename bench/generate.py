@@ -0,0 +1,152 @@
+import argparse
+import math
+import os
+import random
+import time
+from datetime import date, timedelta
+from sqlalchemy import insert
+import db
+from db.models import Account, Category, Transaction, Budget
+from db.rollups import rebuild_rollups
+
+ACCOUNT_NAMES = [("Checking", "Checking"), ("Savings", "Savings"), ("Credit Card", "Credit"), ("Cash", "Cash")]
+INCOME_NAMES = ["Salary", "Interest", "Refunds"]
+EXPENSE_NAMES = ["Groceries", "Dining", "Rent", "Utilities", "Transport", "Shopping", "Entertainment", "Health",
+                 "Insurance", "Travel", "Subscriptions", "Gifts", "Education", "Pets", "Home", "Personal Care"]
+
+
+def _names(base, count, prefix):
+    """The first `count` names from `base`, continued as "<prefix> N" when more are asked for."""
+    return [base[i] if i < len(base) else f"{prefix} {i + 1}" for i in range(count)]
+
+
+def generate(session, transactions=100_000, accounts=4, categories=20, years=3, budget_months=12, seed=0,
+             chunk_size=10_000):
+    """Fill an empty database with synthetic but realistically skewed data.
+
+    Expense categories follow a Zipf-like popularity curve with their own amount ranges, activity grows toward
+    the present and peaks on weekends, income arrives on paydays, and about 2% of rows are planned. Budgets are
+    set for the busiest categories over the last `budget_months` months. Returns the number of transactions.
+    """
+    rng = random.Random(seed)
+    today = date.today()
+    start = date(today.year - years, today.month, 1)
+
+    account_names = _names([name for name, _ in ACCOUNT_NAMES], accounts, "Account")
+    session.execute(insert(Account), [{"name": name, "type": ACCOUNT_NAMES[i % len(ACCOUNT_NAMES)][1], "balance": 0}
+                                      for i, name in enumerate(account_names)])
+    income_count = max(1, categories // 8)
+    session.execute(insert(Category), [{"name": name, "type": "Income"} for name in _names(INCOME_NAMES, income_count, "Income")]
+                    + [{"name": name, "type": "Expense"} for name in _names(EXPENSE_NAMES, categories - income_count, "Expense")])
+    session.commit()
+    account_ids = [account.id for account in session.query(Account).order_by(Account.id)]
+    income_ids = [c.id for c in session.query(Category).filter_by(type="Income").order_by(Category.id)]
+    expense_ids = [c.id for c in session.query(Category).filter_by(type="Expense").order_by(Category.id)]
+
+    # Category popularity (Zipf) and a typical amount per category
+    expense_weights = [1 / (rank + 1) for rank in range(len(expense_ids))]
+    typical = {category_id: rng.choice((8, 15, 30, 60, 120, 400)) for category_id in expense_ids}
+    # Day weights: more activity in recent months and on Fridays/Saturdays
+    days = [start + timedelta(days=i) for i in range((today - start).days + 1)]
+    day_weights = [(0.5 + i / len(days)) * (1.6 if d.weekday() in (4, 5) else 1.0) for i, d in enumerate(days)]
+    cum_days = list(_accumulate(day_weights))
+    cum_expenses = list(_accumulate(expense_weights))
+    account_weights = list(_accumulate([1 / (rank + 1) for rank in range(len(account_ids))]))
+
+    balances = {account_id: round(rng.uniform(500, 5000), 2) for account_id in account_ids}  # Opening balances
+    paydays = [d for d in days if d.day in (1, 15)]
+    payday_share = min(len(paydays) * len(income_ids), transactions // 20)
+    # Pay slightly more than the expected spending, so balances drift up rather than off a cliff
+    mean_expense = sum(w * typical[c] for c, w in zip(expense_ids, expense_weights)) / sum(expense_weights) * math.exp(0.18)
+    salary = (transactions - payday_share) * mean_expense * 1.05 / max(payday_share / len(income_ids), 1)
+
+    def rows():
+        for i in range(transactions):
+            planned = rng.random() < 0.02
+            if i < payday_share:
+                txn_date, category_id = paydays[i % len(paydays)], income_ids[i % len(income_ids)]
+                account_id = rng.choices(account_ids, cum_weights=account_weights)[0]
+                amount = round(salary * rng.uniform(0.9, 1.1) if category_id == income_ids[0] else rng.uniform(5, 200), 2)
+                balances[account_id] += 0 if planned else amount
+            else:
+                txn_date = rng.choices(days, cum_weights=cum_days)[0]
+                category_id = rng.choices(expense_ids, cum_weights=cum_expenses)[0]
+                account_id = rng.choices(account_ids, cum_weights=account_weights)[0]
+                amount = round(min(typical[category_id] * math.exp(rng.gauss(0, 0.6)), 99_999), 2)
+                balances[account_id] -= 0 if planned else amount
+            yield {
+                "date": txn_date + timedelta(days=31) if planned else txn_date,
+                "account_id": account_id,
+                "category_id": category_id,
+                "payee": f"Payee {category_id}-{int(rng.paretovariate(1.2)) % 50}",
+                "amount": amount,
+                "note": "generated" if rng.random() < 0.1 else None,
+                "planned": planned,
+            }
+
+    chunk = []
+    for row in rows():
+        chunk.append(row)
+        if len(chunk) >= chunk_size:
+            session.execute(insert(Transaction.__table__), chunk)
+            session.commit()
+            chunk = []
+    if chunk:
+        session.execute(insert(Transaction.__table__), chunk)
+
+    for account_id, balance in balances.items():
+        session.query(Account).filter_by(id=account_id).update({"balance": round(balance, 2)})
+
+    # Budgets for the busiest categories, near their typical monthly spend
+    month_share = transactions / max(len(days) / 30.4, 1) / sum(expense_weights)
+    year, month = today.year, today.month
+    budgets = []
+    for _ in range(budget_months):
+        for category_id, weight in list(zip(expense_ids, expense_weights))[:10]:
+            target = round(typical[category_id] * weight * month_share * rng.uniform(0.8, 1.3), -1) or 10
+            budgets.append({"category_id": category_id, "month": month, "year": year, "target_amount": target})
+        year, month = (year, month - 1) if month > 1 else (year - 1, 12)
+    session.execute(insert(Budget), budgets)
+    session.commit()
+
+    rebuild_rollups(session)
+    return transactions
+
+
+def _accumulate(weights):
+    total = 0.0
+    for weight in weights:
+        total += weight
+        yield total
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Create a database filled with synthetic transactions for benchmarks.")
+    parser.add_argument("path", help="SQLite file to create")
+    parser.add_argument("--transactions", type=int, default=100_000)
+    parser.add_argument("--accounts", type=int, default=4)
+    parser.add_argument("--categories", type=int, default=20)
+    parser.add_argument("--years", type=int, default=3, help="years of history ending today")
+    parser.add_argument("--budget-months", type=int, default=12)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--force", action="store_true", help="replace the file if it exists")
+    args = parser.parse_args(argv)
+
+    if os.path.exists(args.path):
+        if not args.force:
+            parser.error(f"{args.path} exists (use --force to replace it)")
+        os.remove(args.path)
+
+    db.use_database(args.path)
+    db.init_db()
+    started = time.perf_counter()
+    try:
+        count = generate(db.get_session(), args.transactions, args.accounts, args.categories, args.years,
+                         args.budget_months, args.seed)
+    finally:
+        db.close_session()
+    print(f"Generated {count:,} transactions in {args.path} ({time.perf_counter() - started:.1f}s).")
+
+
+if __name__ == "__main__":
+    main()
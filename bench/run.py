@@ -0,0 +1,253 @@
+import argparse
+import json
+import os
+import platform
+import sqlite3
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import date
+import sqlalchemy
+from sqlalchemy import event, func, select
+import db
+from db.models import Account, Category, Transaction
+from db.queries import TransactionFilter, TransactionPager, month_range, filtered_summary, budget_rows
+from db.rollups import status_totals
+from db.writes import create_transaction, delete_transaction
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "bench-results")
+
+
+class QueryCounter:
+    """Counts statements executed on the engine, from any thread."""
+
+    def __init__(self, engine):
+        self.count = 0
+        event.listen(engine, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, *_):
+        self.count += 1
+
+
+def measure(run, counter, repeat):
+    """Time run() `repeat` times. Returns wall time (ms), queries per run and peak traced memory (KiB)."""
+    times, queries, peaks = [], [], []
+    for _ in range(repeat):
+        before = counter.count
+        tracemalloc.start()
+        started = time.perf_counter()
+        run()
+        times.append((time.perf_counter() - started) * 1000)
+        peaks.append(tracemalloc.get_traced_memory()[1] / 1024)
+        tracemalloc.stop()
+        queries.append(counter.count - before)
+    return {
+        "wall_ms": {"min": min(times), "median": statistics.median(times), "max": max(times)},
+        "queries": max(queries),
+        "peak_kib": max(peaks),
+    }
+
+
+def _busiest_account(session, start_date, end_date):
+    """Name of the account with the most transactions in the month, so the filter benchmark keeps a real subset."""
+    return session.execute(
+        select(Account.name).join(Transaction, Transaction.account_id == Account.id)
+        .where(Transaction.date >= start_date, Transaction.date < end_date)
+        .group_by(Account.id).order_by(func.count().desc()).limit(1)
+    ).scalar()
+
+
+def write_benchmark(session, year, month):
+    """Add and delete one transaction through db.writes: two commits, where journal and sync settings show."""
+    account_id = session.execute(select(Account.id).limit(1)).scalar()
+    category_id = session.execute(select(Category.id).limit(1)).scalar()
+
+    def run():
+        transaction = create_transaction(session, date=date(year, month, 1), account_id=account_id,
+                                         category_id=category_id, payee="bench", amount=1, planned=False)
+        delete_transaction(session, transaction)
+
+    return "db.writes create + delete", run
+
+
+def data_benchmarks(session, year, month):
+    """The queries and row work behind each GUI load path, without Tk. Returns [(name, run)]."""
+    start_date, end_date = month_range(year, month)
+    month_filter = TransactionFilter(start_date, end_date)
+    account_filter = month_filter._replace(account=_busiest_account(session, start_date, end_date))
+
+    # Scrolling to the middle of the all-time list: one keyset jump plus one page, from a fresh pager each run
+    all_time = TransactionFilter()
+    middle = filtered_summary(session, all_time)[0] // 2
+
+    return [
+        ("TransactionsTab.load_data", lambda: TransactionPager(month_filter).load(session)),
+        ("TransactionsTab.apply_filters", lambda: TransactionPager(account_filter).load(session)),
+        # The tab takes its sum from the load; this is that aggregate on its own
+        ("TransactionsTab.refresh_sum", lambda: filtered_summary(session, account_filter)),
+        ("TransactionsTab scroll (all time)", lambda: TransactionPager(all_time).fetch(session, middle, middle + 200)),
+        ("BudgetsTab.load_data", lambda: budget_rows(session, year, month)),
+        ("MainWindow.update_status_bar", lambda: status_totals(session, year, month)),
+        write_benchmark(session, year, month),
+    ]
+
+
+def gui_benchmarks(window, year, month):
+    """The real tab methods on a MainWindow, each waiting until its background load has been shown."""
+    tx_tab, bd_tab = window.tx_tab, window.bd_tab
+    tx_tab.year_var.set(str(year))
+    tx_tab.month_var.set(f"{month:02d}")
+    bd_tab.year_var.set(str(year))
+    bd_tab.month_var.set(f"{month:02d}")
+    _settle(window)
+    start_date, end_date = month_range(year, month)
+    tx_tab.account_var.set(_busiest_account(window.session, start_date, end_date) or "All")
+
+    def settled(method):
+        def run():
+            method()
+            _settle(window)
+        return run
+
+    return [
+        ("TransactionsTab.load_data", settled(tx_tab.load_data)),
+        ("TransactionsTab.apply_filters", settled(tx_tab.apply_filters)),
+        ("TransactionsTab.refresh_sum", settled(tx_tab.refresh_sum)),
+        ("BudgetsTab.load_data", settled(bd_tab.load_data)),
+        ("MainWindow.update_status_bar", settled(window.update_status_bar)),
+        write_benchmark(window.session, year, month),
+    ]
+
+
+def _settle(window):
+    """Run the Tk loop until the query worker has delivered everything and the window has redrawn."""
+    while not window.worker.is_idle():
+        window.update()
+        time.sleep(0.001)
+    window.update()
+
+
+def _open_window():
+    """A MainWindow with every tab built, or None when Tk cannot open a display."""
+    try:
+        from app import MainWindow
+        return MainWindow(lazy_tabs=False)
+    except Exception as e:  # ImportError without tkinter, TclError without a display
+        print(f"Tk unavailable ({e.__class__.__name__}: {e}); benchmarking the data paths only.", file=sys.stderr)
+        return None
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(RESULTS_DIR)).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def _load_into_memory(path):
+    """Copy a database file into the (single, shared) in-memory connection."""
+    raw = db.engine.raw_connection()
+    try:
+        with sqlite3.connect(path) as source:
+            source.backup(raw.driver_connection)
+    finally:
+        raw.close()
+
+
+def run(path, year, month, repeat=5, mode="auto", in_memory=False, tuned=True):
+    """Benchmark every load path against the database at `path`. Returns the results document.
+
+    `in_memory` copies the database into memory first; `tuned=False` runs with SQLite's default PRAGMAs.
+    """
+    db.use_database(":memory:" if in_memory else path, tuned)
+    if in_memory:
+        _load_into_memory(path)
+    db.init_db()
+    counter = QueryCounter(db.engine)
+
+    window = _open_window() if mode != "data" else None
+    if mode == "gui" and window is None:
+        raise SystemExit("--mode gui needs a display")
+    try:
+        session = window.session if window else db.get_session()
+        transactions = session.execute(select(func.count()).select_from(Transaction)).scalar()
+        benchmarks = gui_benchmarks(window, year, month) if window else data_benchmarks(session, year, month)
+        results = {name: measure(run, counter, repeat) for name, run in benchmarks}
+    finally:
+        if window:
+            window.on_closing()
+        else:
+            db.close_session()
+
+    return {
+        "meta": {
+            "database": os.path.abspath(path),
+            "transactions": transactions,
+            "month": f"{year}-{month:02d}",
+            "mode": "gui" if window else "data",
+            "storage": "memory" if in_memory else "file",
+            "pragmas": db.engine.info["pragmas"],
+            "repeat": repeat,
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "sqlalchemy": sqlalchemy.__version__,
+            "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(),
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": results,
+    }
+
+
+def print_report(document, previous=None):
+    """Print one line per benchmark, with the change in median time against a previous results document."""
+    meta = document["meta"]
+    print(f"{meta['transactions']:,} transactions, {meta['month']}, {meta['mode']} mode, {meta['storage']} database, "
+          f"{meta['repeat']} runs each")
+    print("PRAGMAs: " + (", ".join(f"{name}={value}" for name, value in meta["pragmas"].items()) or "SQLite defaults"))
+    print(f"{'benchmark':32} {'median ms':>10} {'min ms':>9} {'queries':>8} {'peak KiB':>10}")
+    for name, result in document["results"].items():
+        wall = result["wall_ms"]
+        line = f"{name:32} {wall['median']:10.2f} {wall['min']:9.2f} {result['queries']:8} {result['peak_kib']:10.1f}"
+        before = (previous or {}).get("results", {}).get(name)
+        if before:
+            change = (wall["median"] / before["wall_ms"]["median"] - 1) * 100 if before["wall_ms"]["median"] else 0
+            line += f"  {change:+.0f}% vs {before['wall_ms']['median']:.2f} ms"
+        print(line)
+
+
+def main(argv=None):
+    today = date.today()
+    parser = argparse.ArgumentParser(description="Time the app's load paths against a database and save the results as JSON.")
+    parser.add_argument("path", help="SQLite database, e.g. one made by `python -m bench.generate`")
+    parser.add_argument("--month", default=f"{today.year}-{today.month:02d}", help="YYYY-MM to load (default: this month)")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per benchmark")
+    parser.add_argument("--mode", choices=("auto", "gui", "data"), default="auto",
+                        help="gui drives a real MainWindow, data runs the same queries without Tk (default: gui when a display is available)")
+    parser.add_argument("--in-memory", action="store_true", help="copy the database into memory and benchmark that")
+    parser.add_argument("--untuned", action="store_true", help="use SQLite's default PRAGMAs instead of db.config's")
+    parser.add_argument("--output", help=f"results file (default: a timestamped file in {RESULTS_DIR})")
+    parser.add_argument("--compare", help="previous results file to compare against")
+    args = parser.parse_args(argv)
+
+    year, month = (int(part) for part in args.month.split("-"))
+    document = run(args.path, year, month, args.repeat, args.mode, args.in_memory, not args.untuned)
+
+    previous = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            previous = json.load(f)
+    print_report(document, previous)
+
+    output = args.output or os.path.join(RESULTS_DIR, f"bench-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(document, f, indent=2)
+    print(f"Saved {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1 @@
+"""Headless command line for reports and batch jobs: `python -m budget --help`. Uses db only, never tkinter."""
@@ -0,0 +1,137 @@
+import argparse
+import json
+import sys
+from datetime import date
+from decimal import Decimal
+from sqlalchemy import select
+import db
+from db import importer, exporter, recurring
+from db.models import Account
+from db.queries import month_summary, budget_rows, rebuild_search_index
+from db.rollups import rebuild_rollups
+from db.ledger import balance_as_of, invalidate_checkpoints
+from db.money import to_cents, from_cents, format_cents
+
+
+def _month(text):
+    """argparse type for YYYY-MM."""
+    try:
+        year, month = (int(part) for part in text.split("-"))
+        date(year, month, 1)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected YYYY-MM, got {text!r}")
+    return year, month
+
+
+def _print_table(headers, rows, as_json):
+    """Print rows as aligned columns, or as a JSON array of objects. Money is passed as Decimal (from_cents)."""
+    if as_json:
+        keys = [header.lower() for header in headers]
+        json.dump([dict(zip(keys, row)) for row in rows], sys.stdout, indent=2, default=float)
+        print()
+        return
+    text_rows = [[f"{value:,.2f}" if isinstance(value, Decimal) else str(value) for value in row] for row in rows]
+    widths = [max(len(str(cell)) for cell in column) for column in zip(headers, *text_rows)]
+    for row in [headers, *text_rows]:
+        print("  ".join(cell.rjust(width) if i else cell.ljust(width) for i, (cell, width) in enumerate(zip(row, widths))))
+
+
+def summary(session, args):
+    """Income, expenses and planned amounts per category for a month."""
+    year, month = args.month
+    totals = month_summary(session, year, month)
+    income = sum(row.posted_cents for row in totals if row.category_type == "Income")
+    expenses = sum(row.posted_cents for row in totals if row.category_type == "Expense")
+    rows = [(row.category_name, row.category_type, from_cents(row.posted_cents), from_cents(row.planned_cents))
+            for row in totals]
+    if args.json:
+        _print_table(("Category", "Type", "Posted", "Planned"), rows, True)
+        return
+    print(f"{year}-{month:02d}: income {format_cents(income, symbol=True)}, expenses {format_cents(expenses, symbol=True)}, "
+          f"net {format_cents(income - expenses, symbol=True)}")
+    if rows:
+        print()
+        _print_table(("Category", "Type", "Posted", "Planned"), rows, False)
+
+
+def budgets(session, args):
+    """Budget targets against posted spend for a month."""
+    year, month = args.month
+    rows = []
+    for budget in budget_rows(session, year, month):
+        target, spent = budget.target_cents, budget.spent_cents
+        rows.append((budget.category_name, from_cents(target), from_cents(spent), from_cents(target - spent),
+                     "Over" if spent > target else "OK"))
+    _print_table(("Category", "Target", "Spent", "Remaining", "Status"), rows, args.json)
+
+
+def balances(session, args):
+    """Current account balances, or balances at the end of a date."""
+    rows = []
+    for account in session.scalars(select(Account).order_by(Account.name)):
+        balance = balance_as_of(session, account.id, args.as_of) if args.as_of else to_cents(account.balance)
+        rows.append((account.name, account.type, balance))
+    if not args.json:
+        rows.append(("Total", "", sum(balance for _, _, balance in rows)))
+    rows = [(name, account_type, from_cents(balance)) for name, account_type, balance in rows]
+    _print_table(("Account", "Type", "Balance"), rows, args.json)
+
+
+def rebuild(session, args):
+    """Recompute monthly rollups, the search index and balance checkpoints from the transactions table."""
+    rebuild_rollups(session)
+    rebuild_search_index(session)
+    for account_id in session.scalars(select(Account.id)):
+        invalidate_checkpoints(session, account_id)
+    session.commit()
+    print("Rebuilt monthly rollups and the search index; balance checkpoints will be recomputed on demand.")
+
+
+def build_parser():
+    today = date.today()
+    parser = argparse.ArgumentParser(prog="python -m budget", description="Personal budgeting reports and batch jobs.")
+    parser.add_argument("--db", metavar="PATH", help="SQLite database file, URL or :memory: (default: BUDGET_DATABASE_URL, "
+                                                     "BUDGET_DB or budget.ini, else budget.db next to the app)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    for name, handler in (("summary", summary), ("budgets", budgets)):
+        command = commands.add_parser(name, help=handler.__doc__)
+        command.add_argument("--month", type=_month, default=(today.year, today.month), help="YYYY-MM (default: this month)")
+        command.add_argument("--json", action="store_true", help="print JSON instead of a table")
+        command.set_defaults(handler=handler)
+
+    command = commands.add_parser("balances", help=balances.__doc__)
+    command.add_argument("--as-of", type=date.fromisoformat, help="balances at the end of this date (YYYY-MM-DD)")
+    command.add_argument("--json", action="store_true", help="print JSON instead of a table")
+    command.set_defaults(handler=balances)
+
+    command = commands.add_parser("import", help="import a CSV, OFX/QFX or QIF file")
+    importer.add_arguments(command)
+    command.set_defaults(handler=importer.run)
+
+    command = commands.add_parser("export", help="export transactions or budgets to CSV or JSON Lines")
+    exporter.add_arguments(command)
+    command.set_defaults(handler=exporter.run)
+
+    command = commands.add_parser("recurring", help="list, add or delete recurring transactions and write their planned entries")
+    recurring.add_arguments(command)
+    command.set_defaults(handler=recurring.run)
+
+    command = commands.add_parser("rebuild", help=rebuild.__doc__)
+    command.set_defaults(handler=rebuild)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.db:
+        db.use_database(args.db)
+    db.init_db()
+    try:
+        args.handler(db.get_session(), args)
+    finally:
+        db.close_session()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,21 +1,167 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, scoped_session
-from db.models import Base
-import os
+from sqlalchemy import text
+from sqlalchemy.orm import Session, sessionmaker, scoped_session
+from db.models import Base, Transaction, RecurringRule
+from db import instrument, reference
+from db.config import DB_PATH, make_engine
 
-# Database file path
-DB_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'budget.db')
-
-# Create engine
-engine = create_engine(f'sqlite:///{DB_PATH}', echo=False)
+# Create engine for the configured database (BUDGET_DATABASE_URL / BUDGET_DB / budget.ini, else DB_PATH)
+engine = make_engine()
 
 # Create session factory
 SessionLocal = scoped_session(sessionmaker(bind=engine, autocommit=False, autoflush=False))
 
 
+def _transaction_columns(session):
+    return {row[1] for row in session.execute(text("PRAGMA table_info(transactions)"))}
+
+
+def _add_transaction_indexes(session):
+    """Create the transaction indexes on databases made before they were declared.
+
+    Indexes on columns a later migration adds are skipped here and created by that migration.
+    """
+    columns = _transaction_columns(session)
+    for index in Transaction.__table__.indexes:
+        if all(column.name in columns for column in index.columns):
+            index.create(session.connection(), checkfirst=True)
+
+
+def _fill_monthly_rollups(session):
+    """Populate monthly_rollups from existing transactions."""
+    from db.rollups import rebuild_rollups
+    rebuild_rollups(session)
+
+
+def _index_transactions_by_account_date(session):
+    """Replace the account_id index with (account_id, date) for balance-as-of lookups."""
+    session.execute(text("DROP INDEX IF EXISTS ix_transactions_account_id"))
+    _add_transaction_indexes(session)
+
+
+def _add_transactions_fts(session):
+    """Full-text index over payee and note, kept in sync with transactions by triggers."""
+    for statement in (
+        "CREATE VIRTUAL TABLE IF NOT EXISTS transactions_fts USING fts5(payee, note, content='transactions', content_rowid='id')",
+        """CREATE TRIGGER IF NOT EXISTS transactions_fts_insert AFTER INSERT ON transactions BEGIN
+            INSERT INTO transactions_fts(rowid, payee, note) VALUES (new.id, new.payee, new.note);
+        END""",
+        """CREATE TRIGGER IF NOT EXISTS transactions_fts_delete AFTER DELETE ON transactions BEGIN
+            INSERT INTO transactions_fts(transactions_fts, rowid, payee, note) VALUES ('delete', old.id, old.payee, old.note);
+        END""",
+        """CREATE TRIGGER IF NOT EXISTS transactions_fts_update AFTER UPDATE OF payee, note ON transactions BEGIN
+            INSERT INTO transactions_fts(transactions_fts, rowid, payee, note) VALUES ('delete', old.id, old.payee, old.note);
+            INSERT INTO transactions_fts(rowid, payee, note) VALUES (new.id, new.payee, new.note);
+        END""",
+        "INSERT INTO transactions_fts(transactions_fts) VALUES ('rebuild')",
+    ):
+        session.execute(text(statement))
+
+
+def _add_transaction_fingerprints(session):
+    """Add the fingerprint column used to skip duplicate imports, and its index."""
+    if "fingerprint" not in _transaction_columns(session):
+        session.execute(text("ALTER TABLE transactions ADD COLUMN fingerprint VARCHAR(64)"))
+    _add_transaction_indexes(session)
+
+
+def _add_recurring_rules(session):
+    """Table of recurring transaction schedules (see db.recurring)."""
+    RecurringRule.__table__.create(session.connection(), checkfirst=True)
+
+
+def _autoincrement_recurring_rules(session):
+    """Rebuild recurring_rules with AUTOINCREMENT, and skip the ids of rules deleted before that.
+
+    Planned transactions are kept when their rule is deleted and are fingerprinted by its id, so a reused id
+    would make a new rule's occurrences look already written.
+    """
+    sql = session.execute(text("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'recurring_rules'")).scalar()
+    if "AUTOINCREMENT" not in sql.upper():
+        session.execute(text("ALTER TABLE recurring_rules RENAME TO recurring_rules_old"))
+        RecurringRule.__table__.create(session.connection())
+        session.execute(text("INSERT INTO recurring_rules SELECT * FROM recurring_rules_old"))
+        session.execute(text("DROP TABLE recurring_rules_old"))
+    # Highest rule id named by a fingerprint "rr:<rule_id>:<date>"
+    highest = session.execute(text(
+        "SELECT max(CAST(substr(fingerprint, 4, instr(substr(fingerprint, 4), ':') - 1) AS INTEGER)) "
+        "FROM transactions WHERE fingerprint LIKE 'rr:%'")).scalar() or 0
+    seq = session.execute(text("SELECT seq FROM sqlite_sequence WHERE name = 'recurring_rules'")).scalar() or 0
+    session.execute(text("DELETE FROM sqlite_sequence WHERE name = 'recurring_rules'"))
+    session.execute(text("INSERT INTO sqlite_sequence (name, seq) VALUES ('recurring_rules', :seq)"),
+                    {"seq": max(seq, highest)})
+
+
+def _bulk_index_fingerprinted_rows(session):
+    """Leave rows inserted with a fingerprint to their writer's one-statement index_inserted_transactions().
+
+    Indexing row by row from the trigger made imports twice as slow as a single INSERT ... SELECT per chunk.
+    """
+    session.execute(text("DROP TRIGGER IF EXISTS transactions_fts_insert"))
+    session.execute(text("""CREATE TRIGGER transactions_fts_insert AFTER INSERT ON transactions
+        WHEN new.fingerprint IS NULL BEGIN
+            INSERT INTO transactions_fts(rowid, payee, note) VALUES (new.id, new.payee, new.note);
+        END"""))
+
+
+# Ordered (version, migration) pairs. Each migration must be safe to run on a freshly created schema,
+# since create_all has already built the latest tables by the time migrations run.
+MIGRATIONS = [
+    (1, _add_transaction_indexes),
+    (2, _fill_monthly_rollups),
+    (3, _index_transactions_by_account_date),
+    (4, _add_transactions_fts),
+    (5, _add_transaction_fingerprints),
+    (6, _add_recurring_rules),
+    (7, _autoincrement_recurring_rules),
+    (8, _bulk_index_fingerprinted_rows),
+]
+
+
+def run_migrations():
+    """Upgrade the database in place to the latest schema version (tracked in PRAGMA user_version)."""
+    with engine.connect() as conn:
+        version = conn.exec_driver_sql("PRAGMA user_version").scalar()
+
+    for target, migrate in MIGRATIONS:
+        if target <= version:
+            continue
+        with Session(engine) as session:
+            migrate(session)
+            session.execute(text(f"PRAGMA user_version = {int(target)}"))
+            session.commit()
+
+
 def init_db():
-    """Initialize database and create tables."""
+    """Initialize database, create tables and apply pending migrations."""
     Base.metadata.create_all(bind=engine)
+    run_migrations()
+
+
+# Set by enable_query_stats(); engines created later by use_database() are instrumented too
+_query_stats = False
+
+
+def enable_query_stats():
+    """Record per-operation statement counts and timings in db.instrument.stats (engine cursor events)."""
+    global _query_stats
+    if not _query_stats:
+        _query_stats = True
+        instrument.attach(engine)
+
+
+def use_database(location, tuned=True):
+    """Point the engine and SessionLocal at another database (a file path, URL or ":memory:", e.g. from a --db option).
+
+    Call before any session is used. `tuned=False` leaves SQLite's default PRAGMAs, for comparison.
+    """
+    global engine
+    close_session()
+    engine.dispose()
+    engine = make_engine(location, tuned)
+    SessionLocal.configure(bind=engine)
+    reference.invalidate()
+    if _query_stats:
+        instrument.attach(engine)
 
 
 def get_session():
@@ -0,0 +1,100 @@
+import configparser
+import os
+from sqlalchemy import create_engine, event
+from sqlalchemy.pool import StaticPool
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Default database file, next to the app
+DB_PATH = os.path.join(APP_DIR, 'budget.db')
+
+# Optional settings file, next to the app (or named by BUDGET_CONFIG):
+#
+#   [database]
+#   path = /data/budget.db        ; or: url = sqlite:////data/budget.db
+#
+#   [pragmas]
+#   synchronous = FULL
+CONFIG_PATH = os.environ.get("BUDGET_CONFIG", os.path.join(APP_DIR, "budget.ini"))
+
+# Applied to every SQLite connection when it opens. Override one with BUDGET_SQLITE_<NAME> (e.g.
+# BUDGET_SQLITE_SYNCHRONOUS=FULL) or in the [pragmas] section; an empty value leaves SQLite's default.
+DEFAULT_PRAGMAS = {
+    "journal_mode": "WAL",  # Readers (the query worker) don't block the writer and vice versa
+    "synchronous": "NORMAL",  # With WAL: durable except for the last commits on power loss, far fewer fsyncs
+    "cache_size": "-65536",  # Page cache in KiB (64 MiB) per connection; SQLite's default is 2 MiB
+    "mmap_size": "268435456",  # Read the first 256 MiB of the file through memory mapping
+    "temp_store": "MEMORY",  # Sorts and temporary indexes stay in memory
+}
+
+# Pragmas that do not apply to an in-memory database
+_FILE_ONLY_PRAGMAS = ("journal_mode", "mmap_size")
+
+MEMORY_URL = "sqlite://"
+
+
+def _read_config():
+    parser = configparser.ConfigParser()
+    parser.read(CONFIG_PATH)
+    return parser
+
+
+def database_url(location=None):
+    """SQLAlchemy URL for `location` (a URL, a file path or ":memory:"), else from the environment, budget.ini or DB_PATH.
+
+    Environment: BUDGET_DATABASE_URL, or BUDGET_DB for a file path.
+    """
+    if location is None:
+        config = _read_config()
+        location = (os.environ.get("BUDGET_DATABASE_URL") or os.environ.get("BUDGET_DB")
+                    or config.get("database", "url", fallback=None) or config.get("database", "path", fallback=None)
+                    or DB_PATH)
+    if location == ":memory:":
+        return MEMORY_URL
+    if "://" in location:
+        return location
+    return f"sqlite:///{location}"
+
+
+def sqlite_pragmas(tuned=True):
+    """The PRAGMAs to apply on connect: DEFAULT_PRAGMAS (unless `tuned` is False) with config and environment overrides."""
+    pragmas = dict(DEFAULT_PRAGMAS) if tuned else {}
+    config = _read_config()
+    if config.has_section("pragmas"):
+        pragmas.update(config.items("pragmas"))
+    for name in list(DEFAULT_PRAGMAS) + list(pragmas):
+        value = os.environ.get(f"BUDGET_SQLITE_{name.upper()}")
+        if value is not None:
+            pragmas[name] = value
+    for name in pragmas:
+        if not name.isidentifier():
+            raise ValueError(f"Invalid PRAGMA name: {name!r}")
+    return {name: value for name, value in pragmas.items() if value != ""}
+
+
+def make_engine(location=None, tuned=True):
+    """Create the engine for `location` (see database_url) with the configured PRAGMAs applied to each connection.
+
+    In-memory databases use a single shared connection (StaticPool), so every session and thread sees the same data.
+    """
+    url = database_url(location)
+    in_memory = url == MEMORY_URL or url.endswith(":memory:")
+    if in_memory:
+        engine = create_engine(url, echo=False, poolclass=StaticPool, connect_args={"check_same_thread": False})
+    else:
+        engine = create_engine(url, echo=False)
+
+    pragmas = sqlite_pragmas(tuned)
+    if in_memory:
+        pragmas = {name: value for name, value in pragmas.items() if name not in _FILE_ONLY_PRAGMAS}
+    engine.info = {"url": url, "pragmas": pragmas}  # What was applied, for reports and benchmarks
+
+    if engine.dialect.name == "sqlite" and pragmas:
+        @event.listens_for(engine, "connect")
+        def apply_pragmas(dbapi_connection, _record):
+            cursor = dbapi_connection.cursor()
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name} = {value}")
+            cursor.close()
+
+    return engine
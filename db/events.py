@@ -0,0 +1,29 @@
+from collections import namedtuple, defaultdict
+
+ENTITIES = ("transaction", "account", "category", "budget")
+ACTIONS = ("created", "updated", "deleted")
+
+# entity: one of ENTITIES, action: one of ACTIONS, ids: ids of the rows that changed (empty for bulk changes
+# such as imports, where subscribers should reload)
+ChangeEvent = namedtuple("ChangeEvent", "entity action ids")
+
+
+class EventBus:
+    """In-process publish/subscribe for data changes, so views can update only what they display."""
+
+    def __init__(self):
+        self._subscribers = defaultdict(list)
+
+    def subscribe(self, entity, callback):
+        """Call callback(event) for every change published for `entity`."""
+        if entity not in ENTITIES:
+            raise ValueError(f"Unknown entity: {entity}")
+        self._subscribers[entity].append(callback)
+
+    def publish(self, entity, action, ids):
+        """Notify subscribers that rows of `entity` were created, updated or deleted."""
+        if entity not in ENTITIES or action not in ACTIONS:
+            raise ValueError(f"Unknown change: {entity} {action}")
+        event = ChangeEvent(entity, action, tuple(ids))
+        for callback in list(self._subscribers[entity]):
+            callback(event)
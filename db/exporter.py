@@ -0,0 +1,168 @@
+import argparse
+import csv
+import gzip
+import json
+from datetime import date
+from sqlalchemy import select, func, type_coerce, Numeric
+from db.models import Account, Category, Transaction, Budget, MonthlyRollup
+from db.money import cents
+from db.queries import TransactionFilter, filter_transactions
+
+FORMATS = ("csv", "jsonl")
+
+# Output columns. Transaction columns use the importer's field names, so an exported CSV imports back as is.
+TRANSACTION_FIELDS = ("id", "date", "account", "category", "payee", "amount", "note", "planned")
+BUDGET_FIELDS = ("id", "year", "month", "category", "target_amount", "spent")
+
+
+def open_output(path, compress=None):
+    """Open a text file for writing, gzip-compressed when `compress` is set (default: when the path ends in .gz)."""
+    if compress is None:
+        compress = str(path).endswith(".gz")
+    if compress:
+        # gzip's default level 9 costs several times more CPU than 6 for a few percent smaller files
+        return gzip.open(path, "wt", compresslevel=6, newline="", encoding="utf-8")
+    return open(path, "w", newline="", encoding="utf-8")
+
+
+def _transaction_select(flt):
+    stmt = (
+        select(
+            Transaction.id,
+            Transaction.date,
+            Account.name,
+            Category.name,
+            Transaction.payee,
+            Transaction.amount,
+            Transaction.note,
+            Transaction.planned,
+        )
+        .outerjoin(Account, Transaction.account_id == Account.id)
+        .outerjoin(Category, Transaction.category_id == Category.id)
+        .order_by(Transaction.date, Transaction.id)
+    )
+    return filter_transactions(stmt, flt)
+
+
+def _budget_select(flt):
+    """Budgets whose month overlaps the filter's date range, with posted spend from monthly_rollups.
+
+    The account filter narrows the spend to that account; the planned filter does not apply to budgets.
+    """
+    # Summed as exact cents, written out as dollars with two decimals
+    spent = type_coerce(func.sum(cents(MonthlyRollup.posted_sum)) / 100.0, Numeric(12, 2))
+    spend = select(MonthlyRollup.year, MonthlyRollup.month, MonthlyRollup.category_id, spent.label("spent"))
+    if flt.account is not None:
+        spend = spend.join(Account, MonthlyRollup.account_id == Account.id).where(Account.name == flt.account)
+    spend = spend.group_by(MonthlyRollup.year, MonthlyRollup.month, MonthlyRollup.category_id).subquery()
+
+    stmt = (
+        select(Budget.id, Budget.year, Budget.month, Category.name, Budget.target_amount, func.coalesce(spend.c.spent, 0))
+        .join(Category, Budget.category_id == Category.id)
+        .outerjoin(spend, (spend.c.year == Budget.year) & (spend.c.month == Budget.month)
+                   & (spend.c.category_id == Budget.category_id))
+        .order_by(Budget.year, Budget.month, Category.name)
+    )
+    period = Budget.year * 12 + Budget.month
+    if flt.start_date is not None:
+        stmt = stmt.where(period >= flt.start_date.year * 12 + flt.start_date.month)
+    if flt.end_date is not None:
+        # end_date is exclusive: a range ending on the 1st does not include that month
+        end = flt.end_date.year * 12 + flt.end_date.month
+        stmt = stmt.where(period < end if flt.end_date.day == 1 else period <= end)
+    if flt.category is not None:
+        stmt = stmt.where(Category.name == flt.category)
+    return stmt
+
+
+def _csv_value(value):
+    if isinstance(value, bool):
+        return "Yes" if value else "No"
+    return "" if value is None else value
+
+
+def _json_default(value):
+    # Only dates and Numeric columns (Decimal) need converting
+    if isinstance(value, date):
+        return value.isoformat()
+    return float(value)
+
+
+def _write_rows(out, fields, rows, fmt):
+    """Write rows to an open text file one at a time. Returns the number of rows written."""
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown export format: {fmt}")
+    count = 0
+    if fmt == "csv":
+        writer = csv.writer(out)
+        writer.writerow(fields)
+        for row in rows:
+            writer.writerow([_csv_value(value) for value in row])
+            count += 1
+    else:
+        for row in rows:
+            out.write(json.dumps(dict(zip(fields, row)), default=_json_default) + "\n")
+            count += 1
+    return count
+
+
+def export_transactions(session, out, flt=TransactionFilter(), fmt="csv", batch_size=1000):
+    """Stream transactions matching `flt` to an open text file, oldest first. Returns the row count.
+
+    Rows are fetched `batch_size` at a time (yield_per), so memory stays flat however large the ledger is.
+    """
+    rows = session.execute(_transaction_select(flt).execution_options(yield_per=batch_size))
+    return _write_rows(out, TRANSACTION_FIELDS, rows, fmt)
+
+
+def export_budgets(session, out, flt=TransactionFilter(), fmt="csv", batch_size=1000):
+    """Stream budgets in the filter's months with their posted spend to an open text file. Returns the row count."""
+    rows = session.execute(_budget_select(flt).execution_options(yield_per=batch_size))
+    return _write_rows(out, BUDGET_FIELDS, rows, fmt)
+
+
+def export_file(session, kind, path, flt=TransactionFilter(), fmt=None, compress=None):
+    """Export "transactions" or "budgets" to a file. The format defaults to the extension (.jsonl or .csv, optionally .gz)."""
+    if fmt is None:
+        fmt = "jsonl" if str(path).removesuffix(".gz").endswith(".jsonl") else "csv"
+    export = export_transactions if kind == "transactions" else export_budgets
+    with open_output(path, compress) as out:
+        return export(session, out, flt, fmt)
+
+
+def add_arguments(parser):
+    """Export options, shared by `python -m db.exporter` and `python -m budget export`."""
+    parser.add_argument("kind", choices=("transactions", "budgets"))
+    parser.add_argument("path", help="output file (.csv, .jsonl, optionally ending in .gz)")
+    parser.add_argument("--from", dest="start", type=date.fromisoformat, help="first date to include (YYYY-MM-DD)")
+    parser.add_argument("--to", dest="end", type=date.fromisoformat, help="first date to exclude (YYYY-MM-DD)")
+    parser.add_argument("--account", help="only this account")
+    parser.add_argument("--category", help="only this category")
+    parser.add_argument("--format", choices=FORMATS, help="output format (default: from the file extension)")
+    parser.add_argument("--gzip", action="store_true", default=None, help="gzip the output (default: when the path ends in .gz)")
+
+
+def run(session, args):
+    """Export what parsed add_arguments() options describe and print a summary."""
+    flt = TransactionFilter(args.start, args.end, args.account, args.category)
+    count = export_file(session, args.kind, args.path, flt, args.format, args.gzip)
+    print(f"Exported {count} {args.kind} to {args.path}.")
+    return count
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export transactions or budgets to CSV or JSON Lines.")
+    add_arguments(parser)
+    args = parser.parse_args(argv)
+
+    from db import init_db, get_session, close_session
+
+    init_db()
+    try:
+        run(get_session(), args)
+    finally:
+        close_session()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,251 @@
+import argparse
+import csv
+import hashlib
+import os
+from collections import namedtuple
+from datetime import date, datetime
+from sqlalchemy import insert, select
+from db.models import Transaction
+from db.rollups import add_delta, apply_deltas
+from db.ledger import invalidate_checkpoints
+from db.money import parse_cents, from_cents
+from db.queries import index_inserted_transactions
+from db.reference import reference_data
+from db.writes import update_balance
+from db.statements import read_ofx, read_qif
+
+# Transaction field -> CSV header. Override per file with the `columns` argument / --map.
+DEFAULT_COLUMNS = {
+    "date": "date",
+    "account": "account",
+    "category": "category",
+    "payee": "payee",
+    "amount": "amount",
+    "note": "note",
+    "planned": "planned",
+}
+
+DATE_FORMATS = ("%Y-%m-%d", "%m/%d/%Y", "%d.%m.%Y")
+
+ImportResult = namedtuple("ImportResult", "imported skipped duplicates errors")
+
+# Fingerprints looked up per query, under SQLite's bound-parameter limit whatever the chunk size
+LOOKUP_BATCH = 5000
+
+
+def read_csv(path, columns=None):
+    """Stream records from a CSV file as {field: text} dicts, one row at a time."""
+    columns = {**DEFAULT_COLUMNS, **(columns or {})}
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        for row in csv.DictReader(f):
+            yield {field: row.get(header) for field, header in columns.items()}
+
+
+def _parse_date(text):
+    text = (text or "").strip()
+    try:
+        return date.fromisoformat(text)
+    except ValueError:
+        pass
+    for fmt in DATE_FORMATS[1:]:
+        try:
+            return datetime.strptime(text, fmt).date()
+        except ValueError:
+            pass
+    raise ValueError(f"invalid date {text!r}")
+
+
+def _parse_planned(text):
+    return (text or "").strip().lower() in ("yes", "y", "true", "1")
+
+
+def transaction_fingerprint(account_id, txn_date, amount_cents, payee, occurrence=0):
+    """Content hash identifying an imported row without a bank id.
+
+    `occurrence` numbers identical rows within one file (two coffees on the same day), so re-importing the
+    file matches each of them instead of collapsing them into one.
+    """
+    amount = f"{amount_cents // 100}.{amount_cents % 100:02d}"
+    key = f"{account_id}|{txn_date.isoformat()}|{amount}|{payee or ''}|{occurrence}"
+    return hashlib.sha1(key.encode()).hexdigest()
+
+
+def fitid_fingerprint(account_id, fitid):
+    """Fingerprint from the bank's own transaction id (OFX FITID), which is unique per account."""
+    return hashlib.sha1(f"fitid|{account_id}|{fitid}".encode()).hexdigest()
+
+
+def import_records(session, records, default_account=None, default_category=None, income_category=None,
+                   chunk_size=20000, max_errors=100):
+    """Insert transaction records in chunks of `chunk_size`, one database transaction per chunk.
+
+    Account and category names are resolved from the cached reference data (db.reference). Rows without a
+    category use `income_category` when their amount is positive (statements sign money out as negative) and
+    `default_category` otherwise; only the magnitude is stored, the category decides the direction.
+
+    Every row gets a fingerprint (see transaction_fingerprint), and rows whose fingerprint is already stored
+    are skipped as duplicates, using indexed lookups of LOOKUP_BATCH fingerprints. New rows are written with a
+    single executemany per chunk, indexed for search with one INSERT ... SELECT, along with that chunk's
+    monthly_rollups deltas and one balance update per account, in the chunk's commit: rows a failed import
+    already wrote are in the balances, so re-importing the file (which skips them) leaves them right. Returns an
+    ImportResult.
+    """
+    reference = reference_data(session)
+    accounts = reference.account_ids
+    categories = {ref.name: (ref.id, ref.type) for ref in reference.categories.values()}
+
+    occurrences = {}  # first-occurrence fingerprint -> identical rows seen so far in this import
+    imported = skipped = duplicates = 0
+    errors = []
+
+    def flush(chunk):
+        """Write the rows of a chunk that are not already stored. Returns how many were written."""
+        fingerprints = [row["fingerprint"] for row, _, _ in chunk]
+        existing = set()
+        for i in range(0, len(fingerprints), LOOKUP_BATCH):
+            existing.update(session.scalars(
+                select(Transaction.fingerprint).where(Transaction.fingerprint.in_(fingerprints[i:i + LOOKUP_BATCH]))))
+        rows, rollup_deltas = [], {}
+        balance_deltas = {}  # account_id -> signed cents of posted rows
+        earliest_posted = {}  # account_id -> earliest posted date, for checkpoint invalidation
+        for row, category_type, amount_cents in chunk:
+            if row["fingerprint"] in existing:
+                continue
+            existing.add(row["fingerprint"])  # Repeated FITIDs within the file
+            rows.append(row)
+            add_delta(rollup_deltas, row["date"], row["category_id"], row["account_id"], amount_cents, row["planned"])
+            if not row["planned"]:
+                account_id, txn_date = row["account_id"], row["date"]
+                signed = amount_cents if category_type == "Income" else -amount_cents
+                balance_deltas[account_id] = balance_deltas.get(account_id, 0) + signed
+                if account_id not in earliest_posted or txn_date < earliest_posted[account_id]:
+                    earliest_posted[account_id] = txn_date
+        if rows:
+            session.execute(insert(Transaction.__table__), rows)
+            index_inserted_transactions(session, len(rows))
+            apply_deltas(session, rollup_deltas)
+        for account_id, delta in balance_deltas.items():
+            session.execute(update_balance(account_id, delta))
+            invalidate_checkpoints(session, account_id, earliest_posted[account_id])
+        session.commit()
+        return len(rows)
+
+    chunk = []
+    for line, record in enumerate(records, start=1):
+        try:
+            amount_cents = parse_cents(record.get("amount"), allow_negative=True)
+            account_name = (record.get("account") or default_account or "").strip()
+            category_name = (record.get("category") or (income_category if amount_cents > 0 else None)
+                             or default_category or "").strip()
+            if account_name not in accounts:
+                raise ValueError(f"unknown account {account_name!r}")
+            if category_name not in categories:
+                raise ValueError(f"unknown category {category_name!r}")
+            account_id = accounts[account_name]
+            category_id, category_type = categories[category_name]
+            txn_date = _parse_date(record.get("date"))
+            planned = _parse_planned(record.get("planned"))
+        except ValueError as e:
+            skipped += 1
+            if len(errors) < max_errors:
+                errors.append((line, str(e)))
+            continue
+
+        amount_cents = abs(amount_cents)
+        payee = (record.get("payee") or "").strip() or None
+        if record.get("fitid"):
+            fingerprint = fitid_fingerprint(account_id, record["fitid"])
+        else:
+            first = transaction_fingerprint(account_id, txn_date, amount_cents, payee)
+            occurrence = occurrences.get(first, 0)
+            occurrences[first] = occurrence + 1
+            fingerprint = first if occurrence == 0 else transaction_fingerprint(account_id, txn_date, amount_cents, payee, occurrence)
+
+        chunk.append(({
+            "date": txn_date,
+            "account_id": account_id,
+            "category_id": category_id,
+            "payee": payee,
+            "amount": from_cents(amount_cents),
+            "note": (record.get("note") or "").strip() or None,
+            "planned": planned,
+            "fingerprint": fingerprint,
+        }, category_type, amount_cents))
+
+        if len(chunk) >= chunk_size:
+            written = flush(chunk)
+            imported += written
+            duplicates += len(chunk) - written
+            chunk = []
+
+    if chunk:
+        written = flush(chunk)
+        imported += written
+        duplicates += len(chunk) - written
+
+    return ImportResult(imported, skipped, duplicates, errors)
+
+
+def import_csv(session, path, columns=None, **options):
+    """Stream a CSV file into the transactions table. See import_records for options."""
+    return import_records(session, read_csv(path, columns), **options)
+
+
+def import_file(session, path, columns=None, **options):
+    """Import a CSV, OFX/QFX or QIF file, chosen by extension. `columns` only applies to CSV."""
+    extension = os.path.splitext(path)[1].lower()
+    if extension in (".ofx", ".qfx"):
+        return import_records(session, read_ofx(path), **options)
+    if extension == ".qif":
+        return import_records(session, read_qif(path), **options)
+    return import_csv(session, path, columns, **options)
+
+
+def parse_column_map(pairs):
+    """Turn ["amount=Amount", "payee=Description"] into {"amount": "Amount", "payee": "Description"}."""
+    columns = {}
+    for pair in pairs or []:
+        field, _, header = pair.partition("=")
+        if field not in DEFAULT_COLUMNS or not header:
+            raise ValueError(f"invalid column mapping {pair!r} (expected one of {', '.join(DEFAULT_COLUMNS)}=HEADER)")
+        columns[field] = header
+    return columns
+
+
+def add_arguments(parser):
+    """Import options, shared by `python -m db.importer` and `python -m budget import`."""
+    parser.add_argument("path", help="CSV file with a header row, or an OFX/QFX/QIF bank statement")
+    parser.add_argument("--account", help="account name for rows without an account column")
+    parser.add_argument("--category", help="category name for rows without a category column")
+    parser.add_argument("--income-category", help="category for rows without a category column and a positive amount")
+    parser.add_argument("--map", action="append", metavar="FIELD=HEADER", help="CSV header for a transaction field (repeatable)")
+    parser.add_argument("--chunk-size", type=int, default=20000, help="rows per database transaction")
+
+
+def run(session, args):
+    """Import the file named by parsed add_arguments() options and print a summary."""
+    result = import_file(session, args.path, parse_column_map(args.map), default_account=args.account,
+                         default_category=args.category, income_category=args.income_category,
+                         chunk_size=args.chunk_size)
+    print(f"Imported {result.imported} transaction(s), skipped {result.duplicates} duplicate(s) and {result.skipped} invalid row(s).")
+    for line, message in result.errors:
+        print(f"  row {line}: {message}")
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Import transactions from a CSV, OFX/QFX or QIF file.")
+    add_arguments(parser)
+    args = parser.parse_args(argv)
+
+    from db import init_db, get_session, close_session
+
+    init_db()
+    try:
+        run(get_session(), args)
+    finally:
+        close_session()
+
+
+if __name__ == "__main__":
+    main()
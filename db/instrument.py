@@ -0,0 +1,123 @@
+import contextvars
+import functools
+import heapq
+import logging
+import math
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from sqlalchemy import event
+
+logger = logging.getLogger("budget.queries")
+
+# Name of the operation issuing queries in this context. QueryWorker copies the context into its threads,
+# so background loads are attributed to the method that submitted them.
+_operation = contextvars.ContextVar("query_operation", default=None)
+
+UNATTRIBUTED = "(other)"
+
+
+@contextmanager
+def operation(name):
+    """Attribute the queries run inside the block (and in loads it submits to the worker) to `name`."""
+    token = _operation.set(name)
+    try:
+        yield
+    finally:
+        _operation.reset(token)
+
+
+def instrumented(func):
+    """Decorator: attribute a function's queries to its qualified name, e.g. "TransactionsTab.load_data"."""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with operation(func.__qualname__):
+            return func(*args, **kwargs)
+    return wrapper
+
+
+class QueryStats:
+    """Statement counts and timings per operation, plus the slowest statements overall. Thread-safe.
+
+    Timings cover cursor execution, which for SQLite is the time to the first row; fetching the rest is not included.
+    """
+
+    def __init__(self, samples=1000, slowest=10):
+        self._lock = threading.Lock()
+        self._samples = samples
+        self._slowest_kept = slowest
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._operations = {}  # name -> [count, total seconds, deque of recent durations]
+            self._slowest = []  # min-heap of (seconds, operation, statement)
+            self.last_operation = None
+
+    def record(self, operation, statement, seconds):
+        with self._lock:
+            stats = self._operations.get(operation)
+            if stats is None:
+                stats = self._operations[operation] = [0, 0.0, deque(maxlen=self._samples)]
+            stats[0] += 1
+            stats[1] += seconds
+            stats[2].append(seconds)
+            self.last_operation = operation
+            entry = (seconds, operation, " ".join(statement.split())[:300])
+            if len(self._slowest) < self._slowest_kept:
+                heapq.heappush(self._slowest, entry)
+            elif seconds > self._slowest[0][0]:
+                heapq.heapreplace(self._slowest, entry)
+
+    def summary(self):
+        """[(operation, count, total_ms, p95_ms)], most total time first. p95 is over the most recent samples."""
+        with self._lock:
+            rows = []
+            for name, (count, total, durations) in self._operations.items():
+                ordered = sorted(durations)
+                p95 = ordered[max(math.ceil(len(ordered) * 0.95) - 1, 0)]
+                rows.append((name, count, total * 1000, p95 * 1000))
+        return sorted(rows, key=lambda row: row[2], reverse=True)
+
+    def slowest(self):
+        """[(ms, operation, statement)], slowest first."""
+        with self._lock:
+            return [(seconds * 1000, name, statement) for seconds, name, statement in sorted(self._slowest, reverse=True)]
+
+    def totals(self):
+        """(statements, total_ms) over every operation."""
+        with self._lock:
+            return (sum(stats[0] for stats in self._operations.values()),
+                    sum(stats[1] for stats in self._operations.values()) * 1000)
+
+    def report(self):
+        """Multi-line text of summary() and slowest(), for logs."""
+        lines = [f"{'operation':40} {'queries':>8} {'total ms':>10} {'p95 ms':>8}"]
+        lines += [f"{name:40} {count:8} {total:10.1f} {p95:8.2f}" for name, count, total, p95 in self.summary()]
+        slowest = self.slowest()
+        if slowest:
+            lines.append("slowest statements:")
+            lines += [f"  {ms:8.2f} ms  {name}: {statement}" for ms, name, statement in slowest]
+        return "\n".join(lines)
+
+
+stats = QueryStats()
+
+
+def attach(engine):
+    """Time every statement on `engine` into `stats`, attributed to the current operation."""
+    @event.listens_for(engine, "before_cursor_execute")
+    def before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info["query_started"].pop()
+        stats.record(_operation.get() or UNATTRIBUTED, statement, time.perf_counter() - started)
+
+    @event.listens_for(engine, "handle_error")
+    def failed(context):
+        started = context.connection.info.get("query_started") if context.connection is not None else None
+        if started:
+            started.pop()
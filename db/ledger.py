@@ -0,0 +1,104 @@
+from datetime import timedelta
+from sqlalchemy import select, func, case, delete, and_, or_, text
+from sqlalchemy.dialects.sqlite import insert
+from db.models import Account, Category, Transaction, BalanceCheckpoint
+from db.queries import month_range
+from db.money import cents, to_cents, from_cents
+
+
+def _period_from(year, month):
+    """Filter for checkpoints at or after (year, month)."""
+    return or_(BalanceCheckpoint.year > year, and_(BalanceCheckpoint.year == year, BalanceCheckpoint.month >= month))
+
+
+def _posted_net(session, account_id, start_date=None, end_date=None):
+    """Signed sum in cents of posted transactions for an account in [start_date, end_date). Income adds, Expense subtracts."""
+    amount = cents(Transaction.amount)
+    signed = case((Category.type == "Income", amount), else_=-amount)
+    stmt = (
+        select(func.coalesce(func.sum(signed), 0))
+        .select_from(Transaction)
+        .join(Category, Transaction.category_id == Category.id)
+        .where(Transaction.account_id == account_id, Transaction.planned == False)
+    )
+    if start_date is not None:
+        stmt = stmt.where(Transaction.date >= start_date)
+    if end_date is not None:
+        stmt = stmt.where(Transaction.date < end_date)
+    return int(session.execute(stmt).scalar())
+
+
+def invalidate_checkpoints(session, account_id, from_date=None):
+    """Drop checkpoints that include from_date (all of them when from_date is None). The caller commits."""
+    stmt = delete(BalanceCheckpoint).where(BalanceCheckpoint.account_id == account_id)
+    if from_date is not None:
+        stmt = stmt.where(_period_from(from_date.year, from_date.month))
+    session.execute(stmt)
+
+
+def _checkpoint_balance(session, account_id, year, month):
+    return session.execute(select(BalanceCheckpoint.balance).where(
+        BalanceCheckpoint.account_id == account_id, BalanceCheckpoint.year == year, BalanceCheckpoint.month == month)
+    ).scalar()
+
+
+def _begin_write(session):
+    """Take the write lock now (BEGIN IMMEDIATE) unless this connection already holds a transaction.
+
+    pysqlite starts no transaction for SELECTs, so without it the reads behind a new checkpoint could fall on
+    either side of another connection's commit (one that just invalidated checkpoints) and store a stale balance.
+    """
+    if not session.connection().connection.dbapi_connection.in_transaction:
+        session.execute(text("BEGIN IMMEDIATE"))
+
+
+def month_end_balance(session, account_id, year, month):
+    """Balance in cents at the end of a month, read from its checkpoint or recomputed from the nearest earlier one.
+
+    A missing checkpoint is computed and stored in one write transaction, so concurrent readers (the query
+    worker's threads) never store a balance from before another commit, nor collide storing the same month.
+    """
+    balance = _checkpoint_balance(session, account_id, year, month)
+    if balance is not None:
+        return to_cents(balance)
+
+    _begin_write(session)
+    balance = _checkpoint_balance(session, account_id, year, month)  # Stored while we waited for the lock
+    if balance is not None:
+        session.commit()
+        return to_cents(balance)
+
+    _, end_date = month_range(year, month)
+    earlier = session.execute(
+        select(BalanceCheckpoint.year, BalanceCheckpoint.month, BalanceCheckpoint.balance)
+        .where(BalanceCheckpoint.account_id == account_id, ~_period_from(year, month))
+        .order_by(BalanceCheckpoint.year.desc(), BalanceCheckpoint.month.desc())
+        .limit(1)
+    ).first()
+
+    if earlier is not None:
+        # Roll forward over the months since the last valid checkpoint
+        _, since = month_range(earlier.year, earlier.month)
+        balance = to_cents(earlier.balance) + _posted_net(session, account_id, since, end_date)
+    else:
+        # No history yet: walk back from the current balance
+        current = session.execute(select(Account.balance).where(Account.id == account_id)).scalar()
+        if current is None:
+            session.commit()
+            return 0
+        balance = to_cents(current) - _posted_net(session, account_id, end_date)
+
+    session.execute(insert(BalanceCheckpoint).values(
+        account_id=account_id, year=year, month=month, balance=from_cents(balance)).on_conflict_do_nothing())
+    session.commit()
+    return balance
+
+
+def balance_as_of(session, account_id, as_of):
+    """Account balance in cents at the end of the given date: one checkpoint plus at most one month of transactions."""
+    start_date, _ = month_range(as_of.year, as_of.month)
+    if as_of.month == 1:
+        previous = month_end_balance(session, account_id, as_of.year - 1, 12)
+    else:
+        previous = month_end_balance(session, account_id, as_of.year, as_of.month - 1)
+    return previous + _posted_net(session, account_id, start_date, as_of + timedelta(days=1))
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, Date, Numeric, Boolean, CheckConstraint, UniqueConstraint
+from sqlalchemy import Column, Integer, String, ForeignKey, Date, Numeric, Boolean, CheckConstraint, UniqueConstraint, Index
 from sqlalchemy.orm import declarative_base, relationship
 
 Base = declarative_base()
@@ -48,6 +48,18 @@ class Transaction(Base):
     amount = Column(Numeric(10, 2), nullable=False)
     note = Column(String(500))
     planned = Column(Boolean, nullable=False, default=False)
+    fingerprint = Column(String(64))  # Identity of an imported (db.importer) or scheduled (db.recurring) row, else NULL
+
+    __table_args__ = (
+        # Month views and the status bar filter on date (and planned)
+        Index('ix_transactions_date_planned', 'date', 'planned'),
+        # Budget spend and the category delete guard
+        Index('ix_transactions_category_date_planned', 'category_id', 'date', 'planned'),
+        # Account delete guard and balance-as-of lookups
+        Index('ix_transactions_account_date', 'account_id', 'date'),
+        # Duplicate detection on import
+        Index('ix_transactions_fingerprint', 'fingerprint'),
+    )
 
     account = relationship("Account", back_populates="transactions")
     category = relationship("Category", back_populates="transactions")
@@ -68,3 +80,49 @@ class Budget(Base):
     )
 
     category = relationship("Category", back_populates="budgets")
+
+
+class RecurringRule(Base):
+    __tablename__ = 'recurring_rules'
+
+    id = Column(Integer, primary_key=True)
+    account_id = Column(Integer, ForeignKey('accounts.id'), nullable=False)
+    category_id = Column(Integer, ForeignKey('categories.id'), nullable=False)
+    payee = Column(String(200))
+    amount = Column(Numeric(10, 2), nullable=False)
+    note = Column(String(500))
+    frequency = Column(String(20), nullable=False)
+    anchor_date = Column(Date, nullable=False)  # First occurrence; later ones keep its day of the month
+    end_date = Column(Date)  # Last day an occurrence may fall on, NULL for open-ended
+    materialized_through = Column(Date)  # Occurrences up to this date have been written as planned transactions
+
+    __table_args__ = (
+        CheckConstraint("frequency IN ('Weekly', 'Biweekly', 'Monthly', 'Quarterly', 'Yearly')",
+                        name='check_recurring_frequency'),
+        # Ids are never reused: planned transactions outlive their rule and are fingerprinted by its id
+        {'sqlite_autoincrement': True},
+    )
+
+    account = relationship("Account")
+    category = relationship("Category")
+
+
+class MonthlyRollup(Base):
+    __tablename__ = 'monthly_rollups'
+
+    year = Column(Integer, primary_key=True)
+    month = Column(Integer, primary_key=True)
+    category_id = Column(Integer, ForeignKey('categories.id'), primary_key=True)
+    account_id = Column(Integer, ForeignKey('accounts.id'), primary_key=True)
+    posted_sum = Column(Numeric(12, 2), nullable=False, default=0.00)
+    planned_sum = Column(Numeric(12, 2), nullable=False, default=0.00)
+    count = Column(Integer, nullable=False, default=0)
+
+
+class BalanceCheckpoint(Base):
+    __tablename__ = 'balance_checkpoints'
+
+    account_id = Column(Integer, ForeignKey('accounts.id'), primary_key=True)
+    year = Column(Integer, primary_key=True)
+    month = Column(Integer, primary_key=True)
+    balance = Column(Numeric(12, 2), nullable=False)  # Balance at the end of the month
@@ -0,0 +1,73 @@
+import re
+from array import array
+from decimal import Decimal, ROUND_HALF_UP
+from sqlalchemy import Integer, cast, func
+
+try:  # Optional: vectorized sums for large result sets
+    import numpy
+except ImportError:
+    numpy = None
+
+# Money is handled as integer cents: parsed and formatted here, summed exactly as int64 columns.
+# Numeric(…, 2) columns are converted on the way in and out with to_cents/from_cents (or cents() in SQL).
+
+_MONEY = re.compile(r"([-+])?\$?(\d{1,3}(?:,\d{3})+|\d+)(?:\.(\d{1,2}))?")
+
+
+def parse_cents(text, allow_negative=False):
+    """Parse user input such as "10", "$10.5" or "1,234.56" into cents. Raises ValueError when it isn't an amount."""
+    match = _MONEY.fullmatch((text or "").strip())
+    if not match or (match.group(1) == "-" and not allow_negative):
+        raise ValueError(f"invalid amount {text!r}")
+    sign, dollars, fraction = match.groups()
+    cents = int(dollars.replace(",", "")) * 100 + int((fraction or "0").ljust(2, "0"))
+    return -cents if sign == "-" else cents
+
+
+def is_amount(text):
+    """True when text is a non-negative dollar amount parse_cents accepts."""
+    try:
+        parse_cents(text)
+    except ValueError:
+        return False
+    return True
+
+
+def to_cents(value):
+    """Cents from a Decimal/float/int dollar value (e.g. a Numeric column), rounding half up. None is 0."""
+    if value is None:
+        return 0
+    return int((Decimal(str(value)) * 100).quantize(Decimal(1), rounding=ROUND_HALF_UP))
+
+
+def from_cents(cents):
+    """Exact Decimal dollars for writing to a Numeric column."""
+    return Decimal(cents).scaleb(-2)
+
+
+def format_cents(cents, symbol=False):
+    """1234567 -> "12,345.67" ("$12,345.67" with symbol, "-$5.00" when negative)."""
+    sign = "-" if cents < 0 else ""
+    dollars, rest = divmod(abs(cents), 100)
+    return f"{sign}{'$' if symbol else ''}{dollars:,}.{rest:02d}"
+
+
+def cents(column):
+    """SQL expression for a Numeric column as integer cents, so sums over it are exact."""
+    return cast(func.round(column * 100), Integer)
+
+
+def cents_column(values):
+    """Pack an iterable of cents into an int64 buffer: a NumPy array when NumPy is installed, else array('q')."""
+    if numpy is not None:
+        return numpy.fromiter(values, dtype=numpy.int64)
+    return array("q", values)
+
+
+def total_cents(values):
+    """Exact sum of an iterable of cents (or a cents_column)."""
+    column = values if isinstance(values, array) or (numpy is not None and isinstance(values, numpy.ndarray)) \
+        else cents_column(values)
+    if numpy is not None and isinstance(column, numpy.ndarray):
+        return int(column.sum())
+    return sum(column)
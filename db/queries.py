@@ -0,0 +1,277 @@
+from collections import namedtuple
+from datetime import date, timedelta
+import re
+import threading
+from sqlalchemy import select, func, case, or_, tuple_, table, column, literal_column, text, false
+from db.models import Account, Category, Transaction, Budget, MonthlyRollup
+from db.rollups import category_spend
+from db.money import cents, total_cents
+
+
+def month_range(year, month):
+    """Return the [start, end) date range covering a calendar month."""
+    start_date = date(year, month, 1)
+    if month == 12:
+        end_date = date(year + 1, 1, 1)
+    else:
+        end_date = date(year, month + 1, 1)
+    return start_date, end_date
+
+
+def quarter_range(year, month):
+    """Return the [start, end) date range of the calendar quarter containing a month."""
+    first = (month - 1) // 3 * 3 + 1
+    return date(year, first, 1), month_range(year, first + 2)[1]
+
+
+def year_to_date_range(today=None):
+    """Return the [start, end) date range from January 1st through today."""
+    today = today or date.today()
+    return date(today.year, 1, 1), today + timedelta(days=1)
+
+
+# FTS5 index over transactions.payee/note (created by migration, not a mapped model)
+transactions_fts = table("transactions_fts", column("rowid"), column("rank"))
+
+
+def rebuild_search_index(session):
+    """Rebuild transactions_fts from the transactions table. The caller commits."""
+    session.execute(text("INSERT INTO transactions_fts(transactions_fts) VALUES ('rebuild')"))
+
+
+def index_inserted_transactions(session, count):
+    """Add the last `count` transactions inserted to transactions_fts in one statement. The caller commits.
+
+    The insert trigger skips rows that have a fingerprint (imports and recurring rules write thousands at a
+    time), so their writer calls this in the same database transaction as the insert. Holding the write lock,
+    that batch is exactly the `count` highest ids.
+    """
+    session.execute(text(
+        "INSERT INTO transactions_fts(rowid, payee, note) SELECT id, payee, note FROM transactions "
+        "WHERE id > (SELECT max(id) FROM transactions) - :count"), {"count": count})
+
+
+def _fts_match(query):
+    """FTS5 MATCH condition matching each word of `query` as a prefix, or None when it has no words."""
+    words = re.findall(r"\w+", query)
+    if not words:
+        return None
+    return literal_column("transactions_fts").op("MATCH")(" ".join(f'"{word}"*' for word in words))
+
+
+# Transaction filter shared by the tabs and the exporter. None means "don't filter": start/end bound a
+# [start, end) date range, account/category are names, planned is True/False, search is text to find in the
+# payee, note, account or category name. With fulltext=True, search is matched like search_transactions instead:
+# each word as a prefix of a word in the payee or note.
+TransactionFilter = namedtuple("TransactionFilter", "start_date end_date account category planned search fulltext",
+                               defaults=(None, None, None, None, None, None, None))
+
+
+def filter_transactions(stmt, flt):
+    """Add a TransactionFilter's conditions to a SELECT joined to Account and Category (e.g. _transaction_row_select)."""
+    if flt.start_date is not None:
+        stmt = stmt.where(Transaction.date >= flt.start_date)
+    if flt.end_date is not None:
+        stmt = stmt.where(Transaction.date < flt.end_date)
+    if flt.account is not None:
+        stmt = stmt.where(Account.name == flt.account)
+    if flt.category is not None:
+        stmt = stmt.where(Category.name == flt.category)
+    if flt.planned is not None:
+        stmt = stmt.where(Transaction.planned == flt.planned)
+    if flt.search and flt.search.strip() and flt.fulltext:
+        # The rows search_transactions ranks, without its limit
+        match = _fts_match(flt.search)
+        stmt = stmt.where(false() if match is None else Transaction.id.in_(select(transactions_fts.c.rowid).where(match)))
+    elif flt.search and flt.search.strip():
+        # Case-insensitive substring match, like the in-memory search of the other tabs; the date range
+        # (indexed) narrows the rows first
+        search = flt.search.strip()
+        stmt = stmt.where(or_(*(field.icontains(search, autoescape=True)
+                                for field in (Transaction.payee, Transaction.note, Account.name, Category.name))))
+    return stmt
+
+
+def _signed_cents():
+    """Transaction amount in cents, signed by category type: Income adds, Expense subtracts, otherwise 0."""
+    amount = cents(Transaction.amount)
+    return case((Category.type == "Income", amount), (Category.type == "Expense", -amount), else_=0)
+
+
+def _transaction_row_select():
+    """SELECT of transaction row tuples joined to their account and category.
+
+    Rows are lightweight tuples (id, date, account_name, category_name, category_type, payee, amount_cents, note,
+    planned) instead of ORM objects.
+    """
+    return (
+        select(
+            Transaction.id,
+            Transaction.date,
+            Account.name.label("account_name"),
+            Category.name.label("category_name"),
+            Category.type.label("category_type"),
+            Transaction.payee,
+            cents(Transaction.amount).label("amount_cents"),
+            Transaction.note,
+            Transaction.planned,
+        )
+        .outerjoin(Account, Transaction.account_id == Account.id)
+        .outerjoin(Category, Transaction.category_id == Category.id)
+    )
+
+
+def _joined(stmt):
+    """Join a SELECT on transactions to the account and category that TransactionFilter conditions refer to."""
+    return (
+        stmt.select_from(Transaction)
+        .outerjoin(Account, Transaction.account_id == Account.id)
+        .outerjoin(Category, Transaction.category_id == Category.id)
+    )
+
+
+def filtered_summary(session, flt):
+    """(count, signed total in cents) of the transactions matching a TransactionFilter; Income adds, Expense subtracts.
+
+    One aggregate query, so totals never depend on which rows have been loaded.
+    """
+    stmt = filter_transactions(_joined(select(func.count(), func.coalesce(func.sum(_signed_cents()), 0))), flt)
+    count, total = session.execute(stmt).one()
+    return count, total
+
+
+def transaction_page(session, flt, after=None, limit=200):
+    """Fetch up to `limit` transactions matching a TransactionFilter, newest first, continuing after a (date, id) key.
+
+    Keyset pagination: each page starts from the last row of the previous one, so deep pages cost the same as
+    the first. Returns the row tuples of _transaction_row_select.
+    """
+    stmt = filter_transactions(_transaction_row_select(), flt)
+    if after is not None:
+        stmt = stmt.where(tuple_(Transaction.date, Transaction.id) < tuple_(*after))
+    return session.execute(stmt.order_by(Transaction.date.desc(), Transaction.id.desc()).limit(limit)).all()
+
+
+class TransactionPager:
+    """The transactions matching a TransactionFilter as a paged source for VirtualTreeview.set_source.
+
+    load() runs the summary query and reads the first page; fetch(session, start, stop) serves later pages by
+    keyset. Jumping past pages that were never read (dragging the scrollbar) finds the (date, id) key just before
+    the target with one OFFSET query over the key columns, counted from the nearest key already known. fetch may
+    be called from several worker threads; calls are serialized.
+    """
+
+    def __init__(self, flt, page_size=200):
+        self.filter = flt
+        self.page_size = page_size
+        self.count = 0
+        self.total_cents = 0
+        self._keys = {0: None}  # row offset -> (date, id) of the row just before it
+        self._first = []
+        self._lock = threading.Lock()  # Guards _keys
+
+    def load(self, session):
+        """Read the count, total and first page. Returns self, so it can be the result of a background load."""
+        self.count, self.total_cents = filtered_summary(session, self.filter)
+        self._first = self.fetch(session, 0, min(self.page_size, self.count))
+        return self
+
+    def cached(self, start, stop):
+        """Rows [start, stop) if load() already read them, else None."""
+        if start == 0 and self._first and stop <= len(self._first):
+            return self._first[:stop]
+        return None
+
+    def fetch(self, session, start, stop):
+        """Rows [start, stop) of the result."""
+        rows = self.cached(start, stop)
+        if rows is not None:
+            return rows
+        with self._lock:
+            after = self._key_before(session, start)
+            if start and after is None:
+                return []  # Fewer rows than counted: they were deleted since load()
+            rows = transaction_page(session, self.filter, after, stop - start)
+            if rows:
+                self._keys[start + len(rows)] = (rows[-1].date, rows[-1].id)
+            return rows
+
+    def _key_before(self, session, start):
+        if start not in self._keys:
+            known = max(offset for offset in self._keys if offset < start)
+            stmt = filter_transactions(_joined(select(Transaction.date, Transaction.id)), self.filter)
+            if self._keys[known] is not None:
+                stmt = stmt.where(tuple_(Transaction.date, Transaction.id) < tuple_(*self._keys[known]))
+            stmt = stmt.order_by(Transaction.date.desc(), Transaction.id.desc()).offset(start - known - 1).limit(1)
+            row = session.execute(stmt).first()
+            self._keys[start] = tuple(row) if row else None
+        return self._keys[start]
+
+
+def signed_total(rows):
+    """Exact sum in cents of transaction row tuples: Income adds, Expense subtracts."""
+    sign = {"Income": 1, "Expense": -1}
+    return total_cents(sign.get(txn.category_type, 0) * txn.amount_cents for txn in rows)
+
+
+def search_transactions(session, query, limit=500, flt=None):
+    """Full-text search payee and note across all dates, best matches first.
+
+    Each word of the query is matched as a prefix, so "amaz ref" finds "Amazon refund". A TransactionFilter
+    (without search text) narrows the matches further. Returns the row tuples of _transaction_row_select.
+    """
+    match = _fts_match(query)
+    if match is None:
+        return []
+
+    stmt = (
+        _transaction_row_select()
+        .join(transactions_fts, transactions_fts.c.rowid == Transaction.id)
+        .where(match)
+        .order_by(transactions_fts.c.rank, Transaction.date.desc())
+        .limit(limit)
+    )
+    if flt is not None:
+        stmt = filter_transactions(stmt, flt._replace(search=None))
+    return session.execute(stmt).all()
+
+
+def budget_rows(session, year, month):
+    """Fetch budgets for a month with posted spend per category (from monthly_rollups) in a single query.
+
+    Returns row tuples (id, category_name, target_cents, spent_cents).
+    """
+    spent = category_spend(year, month)
+    stmt = (
+        select(
+            Budget.id,
+            Category.name.label("category_name"),
+            cents(Budget.target_amount).label("target_cents"),
+            func.coalesce(spent.c.spent, 0).label("spent_cents"),
+        )
+        .join(Category, Budget.category_id == Category.id)
+        .outerjoin(spent, spent.c.category_id == Budget.category_id)
+        .where(Budget.month == month, Budget.year == year)
+        .order_by(Budget.id)
+    )
+    return session.execute(stmt).all()
+
+
+def month_summary(session, year, month):
+    """Posted and planned totals per category for a month, from monthly_rollups.
+
+    Returns row tuples (category_name, category_type, posted_cents, planned_cents), income first, then by name.
+    """
+    stmt = (
+        select(
+            Category.name.label("category_name"),
+            Category.type.label("category_type"),
+            func.sum(cents(MonthlyRollup.posted_sum)).label("posted_cents"),
+            func.sum(cents(MonthlyRollup.planned_sum)).label("planned_cents"),
+        )
+        .join(Category, MonthlyRollup.category_id == Category.id)
+        .where(MonthlyRollup.year == year, MonthlyRollup.month == month, MonthlyRollup.count > 0)
+        .group_by(Category.id)
+        .order_by(Category.type.desc(), Category.name)
+    )
+    return session.execute(stmt).all()
@@ -0,0 +1,177 @@
+import calendar
+from datetime import date, timedelta
+from sqlalchemy import insert, select
+from db.models import RecurringRule, Transaction
+from db.money import to_cents, parse_cents, from_cents, format_cents
+from db.queries import index_inserted_transactions
+from db.reference import reference_data
+from db.rollups import add_delta, apply_deltas
+
+# Frequency -> (days, months) between occurrences
+FREQUENCIES = {
+    "Weekly": (7, 0),
+    "Biweekly": (14, 0),
+    "Monthly": (0, 1),
+    "Quarterly": (0, 3),
+    "Yearly": (0, 12),
+}
+
+HORIZON_DAYS = 90
+
+
+def _add_months(anchor, months):
+    """`anchor` moved by whole months, on its day of the month or the month's last day (Jan 31 -> Feb 28)."""
+    year, month = divmod(anchor.month - 1 + months, 12)
+    year, month = anchor.year + year, month + 1
+    return date(year, month, min(anchor.day, calendar.monthrange(year, month)[1]))
+
+
+def occurrences(frequency, anchor_date, start, end):
+    """Dates in [start, end] on which a rule with this frequency and first occurrence falls."""
+    days, months = FREQUENCIES[frequency]
+    if days:
+        n = max(0, -(-(start - anchor_date).days // days))  # First step on or after start
+        current = anchor_date + timedelta(days=n * days)
+        while current <= end:
+            yield current
+            current += timedelta(days=days)
+        return
+    n = max(0, ((start.year - anchor_date.year) * 12 + start.month - anchor_date.month) // months - 1)
+    while True:
+        current = _add_months(anchor_date, n * months)
+        if current > end:
+            return
+        if current >= start:
+            yield current
+        n += 1
+
+
+def rule_fingerprint(rule_id, occurrence):
+    """Fingerprint of the planned transaction a rule materializes on a date, e.g. "rr:3:2026-11-01"."""
+    return f"rr:{rule_id}:{occurrence.isoformat()}"
+
+
+def materialize(session, today=None, horizon_days=HORIZON_DAYS):
+    """Write the planned transactions of every rule from its last run (or today) through today + horizon_days.
+
+    Occurrences already written are found by fingerprint with one indexed lookup and skipped, and each rule
+    remembers how far it has been materialized, so running again (at every startup) inserts nothing and a
+    planned entry the user deleted is not recreated. New rows and their monthly_rollups deltas are written
+    with one executemany each, in a single commit. Returns the number of transactions inserted.
+    """
+    today = today or date.today()
+    until = today + timedelta(days=horizon_days)
+    # Rules not yet written through the horizon (or, when they end sooner, through their end date)
+    rules = session.scalars(select(RecurringRule).where(
+        (RecurringRule.materialized_through == None)
+        | ((RecurringRule.materialized_through < until)
+           & ((RecurringRule.end_date == None) | (RecurringRule.materialized_through < RecurringRule.end_date))))).all()
+    if not rules:
+        return 0
+
+    wanted = []
+    for rule in rules:
+        # Past occurrences are not back-filled: they were posted (or imported) when they happened
+        start = max(rule.anchor_date, today)
+        if rule.materialized_through is not None:
+            start = max(start, rule.materialized_through + timedelta(days=1))
+        end = min(until, rule.end_date) if rule.end_date else until
+        wanted += [(rule, occurrence) for occurrence in occurrences(rule.frequency, rule.anchor_date, start, end)]
+        rule.materialized_through = max(end, rule.materialized_through or end)
+
+    fingerprints = [rule_fingerprint(rule.id, occurrence) for rule, occurrence in wanted]
+    existing = set()
+    for i in range(0, len(fingerprints), 500):  # Stay under SQLite's bound-parameter limit
+        existing.update(session.scalars(
+            select(Transaction.fingerprint).where(Transaction.fingerprint.in_(fingerprints[i:i + 500]))))
+
+    rows, deltas = [], {}
+    for (rule, occurrence), fingerprint in zip(wanted, fingerprints):
+        if fingerprint in existing:
+            continue
+        amount_cents = to_cents(rule.amount)
+        rows.append({
+            "date": occurrence,
+            "account_id": rule.account_id,
+            "category_id": rule.category_id,
+            "payee": rule.payee,
+            "amount": from_cents(amount_cents),
+            "note": rule.note,
+            "planned": True,
+            "fingerprint": fingerprint,
+        })
+        add_delta(deltas, occurrence, rule.category_id, rule.account_id, amount_cents, True)
+
+    if rows:
+        session.execute(insert(Transaction.__table__), rows)
+        index_inserted_transactions(session, len(rows))
+        apply_deltas(session, deltas)
+    session.commit()
+    return len(rows)
+
+
+def add_rule(session, account, category, amount, frequency, anchor_date, payee=None, note=None, end_date=None):
+    """Create a rule from account/category names and an amount in cents. Raises ValueError for unknown names."""
+    reference = reference_data(session)
+    if account not in reference.account_ids:
+        raise ValueError(f"unknown account {account!r}")
+    if category not in reference.category_ids:
+        raise ValueError(f"unknown category {category!r}")
+    if frequency not in FREQUENCIES:
+        raise ValueError(f"unknown frequency {frequency!r} (expected one of {', '.join(FREQUENCIES)})")
+    rule = RecurringRule(account_id=reference.account_ids[account], category_id=reference.category_ids[category],
+                         amount=from_cents(amount), frequency=frequency, anchor_date=anchor_date, end_date=end_date,
+                         payee=payee, note=note)
+    session.add(rule)
+    session.commit()
+    return rule
+
+
+def add_arguments(parser):
+    """`python -m budget recurring` subcommands: list, add, delete and run."""
+    actions = parser.add_subparsers(dest="action", required=True)
+    actions.add_parser("list", help="show the recurring rules")
+
+    command = actions.add_parser("add", help="add a rule; its planned transactions are written right away")
+    command.add_argument("--account", required=True)
+    command.add_argument("--category", required=True)
+    command.add_argument("--amount", required=True, help="dollar amount, e.g. 1500 or 12.99")
+    command.add_argument("--frequency", required=True, type=str.capitalize, choices=list(FREQUENCIES))
+    command.add_argument("--start", required=True, type=date.fromisoformat, help="first occurrence (YYYY-MM-DD)")
+    command.add_argument("--end", type=date.fromisoformat, help="no occurrences after this date (YYYY-MM-DD)")
+    command.add_argument("--payee")
+    command.add_argument("--note")
+
+    command = actions.add_parser("delete", help="delete a rule; planned transactions already written are kept")
+    command.add_argument("id", type=int)
+
+    command = actions.add_parser("run", help="write planned transactions due within the horizon (done at app startup)")
+    command.add_argument("--horizon", type=int, default=HORIZON_DAYS, help=f"days ahead (default {HORIZON_DAYS})")
+
+
+def run(session, args):
+    """Carry out the parsed add_arguments() action and print the result."""
+    if args.action == "list":
+        reference = reference_data(session)
+        for rule in session.scalars(select(RecurringRule).order_by(RecurringRule.id)):
+            account, category = reference.accounts.get(rule.account_id), reference.categories.get(rule.category_id)
+            until = f" until {rule.end_date}" if rule.end_date else ""
+            print(f"{rule.id:4}  {rule.frequency:9} from {rule.anchor_date}{until}  "
+                  f"{format_cents(to_cents(rule.amount), symbol=True)}  {rule.payee or ''}  "
+                  f"[{account.name if account else '?'} / {category.name if category else '?'}]")
+    elif args.action == "add":
+        try:
+            rule = add_rule(session, args.account, args.category, parse_cents(args.amount), args.frequency, args.start,
+                            args.payee, args.note, args.end)
+        except ValueError as e:
+            raise SystemExit(str(e))
+        print(f"Added rule {rule.id}; wrote {materialize(session)} planned transaction(s).")
+    elif args.action == "delete":
+        rule = session.get(RecurringRule, args.id)
+        if rule is None:
+            raise SystemExit(f"No recurring rule {args.id}")
+        session.delete(rule)
+        session.commit()
+        print(f"Deleted rule {args.id}.")
+    else:
+        print(f"Wrote {materialize(session, horizon_days=args.horizon)} planned transaction(s).")
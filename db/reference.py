@@ -0,0 +1,65 @@
+import threading
+from collections import namedtuple
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+from db.models import Account, Category
+
+AccountRef = namedtuple("AccountRef", "id name type")
+CategoryRef = namedtuple("CategoryRef", "id name type")
+
+# Snapshot of the reference tables: accounts/categories map id -> row (in id order), account_ids/category_ids
+# map name -> id. Snapshots are never modified, so they can be shared between threads.
+ReferenceData = namedtuple("ReferenceData", "version accounts categories account_ids category_ids")
+
+_lock = threading.Lock()
+_version = 0  # Bumped by every commit that changed an Account or Category through the ORM
+_cached = None
+
+
+def reference_data(session):
+    """Accounts and categories by id and by name, loaded with `session` only when they changed since the last load."""
+    global _cached
+    cached = _cached
+    if cached is not None and cached.version == _version:
+        return cached
+    with _lock:
+        version = _version
+        accounts = {row.id: AccountRef(*row) for row in
+                    session.execute(select(Account.id, Account.name, Account.type).order_by(Account.id))}
+        categories = {row.id: CategoryRef(*row) for row in
+                      session.execute(select(Category.id, Category.name, Category.type).order_by(Category.id))}
+        cached = ReferenceData(version, accounts, categories,
+                               {ref.name: ref.id for ref in accounts.values()},
+                               {ref.name: ref.id for ref in categories.values()})
+        _cached = cached
+    return cached
+
+
+def invalidate():
+    """Force the next reference_data() call to reload, e.g. after changing the tables with bulk SQL."""
+    global _version
+    with _lock:
+        _version += 1
+
+
+def _touches_reference(session):
+    # In after_flush the new/dirty/deleted collections still describe what was just flushed
+    return any(isinstance(obj, (Account, Category)) for obj in (*session.new, *session.dirty, *session.deleted))
+
+
+# Every Session: note flushes that wrote accounts or categories, and invalidate once they are committed
+@event.listens_for(Session, "after_flush")
+def _after_flush(session, _context):
+    if _touches_reference(session):
+        session.info["reference_changed"] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _after_commit(session):
+    if session.info.pop("reference_changed", False):
+        invalidate()
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _after_rollback(session, _previous_transaction):
+    session.info.pop("reference_changed", None)
@@ -0,0 +1,107 @@
+from sqlalchemy import select, func, delete, extract, case
+from sqlalchemy.dialects.sqlite import insert
+from db.models import Transaction, Budget, MonthlyRollup
+from db.money import cents, to_cents, from_cents
+
+
+def add_delta(deltas, txn_date, category_id, account_id, amount_cents, planned, sign=1):
+    """Accumulate one transaction's contribution in cents (sign=1 to add, -1 to remove) into a deltas dict."""
+    key = (txn_date.year, txn_date.month, category_id, account_id)
+    posted_sum, planned_sum, count = deltas.get(key, (0, 0, 0))
+    if planned:
+        planned_sum += sign * amount_cents
+    else:
+        posted_sum += sign * amount_cents
+    deltas[key] = (posted_sum, planned_sum, count + sign)
+
+
+def apply_deltas(session, deltas):
+    """Upsert accumulated deltas into monthly_rollups with a single executemany. The caller commits."""
+    if not deltas:
+        return
+    stmt = insert(MonthlyRollup)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["year", "month", "category_id", "account_id"],
+        # Rounded to the cent on every update, so the stored sums never drift
+        set_={
+            "posted_sum": func.round(MonthlyRollup.posted_sum + stmt.excluded.posted_sum, 2),
+            "planned_sum": func.round(MonthlyRollup.planned_sum + stmt.excluded.planned_sum, 2),
+            "count": MonthlyRollup.count + stmt.excluded.count,
+        },
+    )
+    session.execute(stmt, [
+        {"year": year, "month": month, "category_id": category_id, "account_id": account_id,
+         "posted_sum": from_cents(posted_sum), "planned_sum": from_cents(planned_sum), "count": count}
+        for (year, month, category_id, account_id), (posted_sum, planned_sum, count) in deltas.items()
+    ])
+
+
+def record_transaction(session, txn, sign=1):
+    """Add (sign=1) or remove (sign=-1) a single transaction from the rollups. The caller commits."""
+    deltas = {}
+    add_delta(deltas, txn.date, txn.category_id, txn.account_id, to_cents(txn.amount), txn.planned, sign)
+    apply_deltas(session, deltas)
+
+
+def drop_account_rollups(session, account_id):
+    """Delete an account's monthly_rollups rows (all zero once its transactions are gone). The caller commits."""
+    session.execute(delete(MonthlyRollup).where(MonthlyRollup.account_id == account_id))
+
+
+def rebuild_rollups(session):
+    """Recompute monthly_rollups from the transactions table."""
+    year = extract("year", Transaction.date)
+    month = extract("month", Transaction.date)
+    totals = select(
+        year,
+        month,
+        Transaction.category_id,
+        Transaction.account_id,
+        # Summed as integer cents, so the totals are exact
+        func.sum(case((Transaction.planned == False, cents(Transaction.amount)), else_=0)) / 100.0,
+        func.sum(case((Transaction.planned == True, cents(Transaction.amount)), else_=0)) / 100.0,
+        func.count(),
+    ).group_by(year, month, Transaction.category_id, Transaction.account_id)
+
+    session.execute(delete(MonthlyRollup))
+    session.execute(insert(MonthlyRollup).from_select(
+        ["year", "month", "category_id", "account_id", "posted_sum", "planned_sum", "count"], totals))
+    session.commit()
+
+
+def category_spend(year, month):
+    """Subquery of posted spend per category for a month in cents, served from the rollups."""
+    return (
+        select(MonthlyRollup.category_id, func.sum(cents(MonthlyRollup.posted_sum)).label("spent"))
+        .where(MonthlyRollup.year == year, MonthlyRollup.month == month)
+        .group_by(MonthlyRollup.category_id)
+        .subquery()
+    )
+
+
+def status_totals(session, year, month):
+    """Return (month_spend, planned_total, alarms) for the status bar in one query, amounts in cents."""
+    spent = category_spend(year, month)
+    month_spend = (
+        select(func.coalesce(func.sum(cents(MonthlyRollup.posted_sum)), 0))
+        .where(MonthlyRollup.year == year, MonthlyRollup.month == month)
+        .scalar_subquery()
+    )
+    planned_total = select(func.coalesce(func.sum(cents(MonthlyRollup.planned_sum)), 0)).scalar_subquery()
+    alarms = (
+        select(func.count())
+        .select_from(Budget)
+        .join(spent, spent.c.category_id == Budget.category_id)
+        .where(Budget.year == year, Budget.month == month, spent.c.spent > cents(Budget.target_amount))
+        .scalar_subquery()
+    )
+    return session.execute(select(month_spend, planned_total, alarms)).one()
+
+
+if __name__ == "__main__":
+    from db import init_db, get_session, close_session
+
+    init_db()
+    rebuild_rollups(get_session())
+    close_session()
+    print("Monthly rollups rebuilt.")
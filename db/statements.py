@@ -0,0 +1,70 @@
+import html
+import re
+from datetime import date
+
+# Bank statement readers. Like db.importer.read_csv they stream {field: text} records, plus a "fitid" field
+# when the bank supplies its own transaction id. Amounts keep the statement's sign: negative is money out.
+
+_OFX_TRANSACTION = re.compile(r"<STMTTRN>(.*?)(?:</STMTTRN>|(?=<STMTTRN>)|(?=</BANKTRANLIST>))", re.S | re.I)
+# OFX 1.x is SGML and may omit closing tags, so a value runs to the next tag or line break
+_OFX_FIELD = re.compile(r"<(\w+)>([^<\r\n]*)")
+
+
+def _ofx_date(text):
+    # YYYYMMDD, optionally followed by a time and timezone, e.g. 20250114120000.000[-5:EST]
+    return f"{text[0:4]}-{text[4:6]}-{text[6:8]}"
+
+
+def read_ofx(path):
+    """Stream transactions from an OFX/QFX file (SGML 1.x or XML 2.x)."""
+    with open(path, encoding="utf-8", errors="replace") as f:
+        content = f.read()  # Statements are small; the records are still produced one at a time
+    for match in _OFX_TRANSACTION.finditer(content):
+        # Values are SGML/XML text: "AT&amp;T" is AT&T
+        fields = {tag.upper(): html.unescape(value.strip()) for tag, value in _OFX_FIELD.findall(match.group(1))}
+        yield {
+            "date": _ofx_date(fields.get("DTPOSTED", "")),
+            "payee": fields.get("NAME") or fields.get("PAYEE"),
+            "amount": fields.get("TRNAMT"),
+            "note": fields.get("MEMO"),
+            "fitid": fields.get("FITID"),
+        }
+
+
+def _qif_date(text):
+    # Quicken writes M/D/YY, M/D'YY (years 2000+) or M/D/YYYY, sometimes with spaces or dashes
+    parts = re.split(r"[/'\-.]", text.replace(" ", ""))
+    if len(parts) != 3 or not all(part.isdigit() for part in parts):
+        return text
+    month, day, year = (int(part) for part in parts)
+    if year < 100:
+        year += 2000 if year < 70 or "'" in text else 1900
+    try:
+        return date(year, month, day).isoformat()
+    except ValueError:
+        return text
+
+
+def read_qif(path):
+    """Stream transactions from a QIF file, one record per "^"-terminated block."""
+    record = {}
+    with open(path, encoding="utf-8", errors="replace") as f:
+        for line in f:
+            line = line.rstrip("\r\n")
+            if not line or line.startswith("!"):
+                continue
+            code, value = line[0], line[1:].strip()
+            if code == "^":
+                if record:
+                    yield record
+                record = {}
+            elif code == "D":
+                record["date"] = _qif_date(value)
+            elif code in "TU":
+                record["amount"] = value
+            elif code == "P":
+                record["payee"] = value
+            elif code == "M":
+                record["note"] = value
+    if record:
+        yield record
@@ -0,0 +1,90 @@
+from sqlalchemy import update, func
+from db.models import Account, Transaction
+from db.rollups import record_transaction
+from db.ledger import invalidate_checkpoints
+from db.instrument import instrumented
+from db.money import to_cents, from_cents
+from db.reference import reference_data
+
+
+def _signed_amount(session, category_id, amount):
+    """Signed cents: Income adds to an account balance, Expense subtracts from it."""
+    category = reference_data(session).categories.get(category_id)
+    if category is None:
+        return 0
+    return to_cents(amount) if category.type == "Income" else -to_cents(amount)
+
+
+def _add_balance_delta(session, deltas, transaction, sign):
+    """Accumulate a posted transaction's effect on its account balance and drop checkpoints it falls into."""
+    if transaction.planned:
+        return
+    invalidate_checkpoints(session, transaction.account_id, transaction.date)
+    delta = sign * _signed_amount(session, transaction.category_id, transaction.amount)
+    deltas[transaction.account_id] = deltas.get(transaction.account_id, 0) + delta
+
+
+def _apply_balance_deltas(session, deltas):
+    """Apply balance changes in SQL so concurrent or stale in-memory balances are never written back."""
+    for account_id, delta in deltas.items():
+        if delta:
+            session.execute(update_balance(account_id, delta))
+
+
+def update_balance(account_id, delta_cents):
+    """UPDATE adding a delta in cents to an account balance, rounded to the cent so repeated updates never drift."""
+    return update(Account).where(Account.id == account_id).values(
+        balance=func.round(Account.balance + from_cents(delta_cents), 2))
+
+
+@instrumented
+def create_transaction(session, **fields):
+    """Insert a transaction, its rollup and its balance delta in one database transaction."""
+    try:
+        transaction = Transaction(**fields)
+        session.add(transaction)
+        deltas = {}
+        _add_balance_delta(session, deltas, transaction, 1)
+        record_transaction(session, transaction)
+        _apply_balance_deltas(session, deltas)
+        session.commit()
+        return transaction
+    except Exception:
+        session.rollback()
+        raise
+
+
+@instrumented
+def update_transaction(session, transaction, **fields):
+    """Update a transaction, moving its rollup and balance effect, in one database transaction."""
+    try:
+        deltas = {}
+        _add_balance_delta(session, deltas, transaction, -1)
+        record_transaction(session, transaction, -1)
+
+        for name, value in fields.items():
+            setattr(transaction, name, value)
+
+        _add_balance_delta(session, deltas, transaction, 1)
+        record_transaction(session, transaction)
+        _apply_balance_deltas(session, deltas)
+        session.commit()
+        return transaction
+    except Exception:
+        session.rollback()
+        raise
+
+
+@instrumented
+def delete_transaction(session, transaction):
+    """Delete a transaction and reverse its rollup and balance effect in one database transaction."""
+    try:
+        deltas = {}
+        _add_balance_delta(session, deltas, transaction, -1)
+        record_transaction(session, transaction, -1)
+        _apply_balance_deltas(session, deltas)
+        session.delete(transaction)
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
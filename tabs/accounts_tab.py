@@ -1,8 +1,21 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
-import re
+from collections import namedtuple
+from datetime import date
+from sqlalchemy import select
 from sqlalchemy.exc import IntegrityError
-from db.models import Account, Transaction
+from utils import make_date_triple
+from utils.view_model import FilterableViewModel
+from utils.scheduler import InputScheduler
+from db.models import Account, Transaction, RecurringRule
+from db.ledger import balance_as_of, invalidate_checkpoints
+from db.rollups import drop_account_rollups
+from db.instrument import instrumented
+from db.reference import reference_data
+from db.money import is_amount, parse_cents, to_cents, from_cents, format_cents, total_cents
+
+
+AccountRow = namedtuple("AccountRow", "id name type balance")  # balance in cents
 
 
 class AccountsTab(ttk.Frame):
@@ -12,9 +25,15 @@ class AccountsTab(ttk.Frame):
         self.main_window = main_window
         self.session = main_window.session
         self._item_ids = {}
+        self._changed_ids = set()  # Accounts named in change events whose rows are being read
+        self.view = FilterableViewModel(lambda acc: (acc.name,), key=lambda acc: acc.id)
         self._build_ui()
         self.load_data()
 
+        # Account edits patch single rows; posted transactions move balances
+        main_window.events.subscribe("account", lambda e: main_window.notify(self, lambda: self._on_accounts_changed(e)))
+        main_window.events.subscribe("transaction", lambda e: main_window.notify(self, self.load_data))
+
     def _build_ui(self):
         """Builds the UI itself using all of its elements"""
         # Filter bar
@@ -27,11 +46,20 @@ class AccountsTab(ttk.Frame):
 
         ttk.Label(bar, text="Search:").pack(side="left")
         self.search_var = tk.StringVar()
-        self.search_var.trace_add("write", lambda *_: self.apply_filters())
+        # Keystrokes are debounced into one search pass
+        self._search_input = InputScheduler(self, self.apply_search)
+        self.search_var.trace_add("write", self._search_input.schedule)
         ttk.Entry(bar, textvariable=self.search_var, width=16).pack(side="left", padx=4)
 
         ttk.Button(bar, text="Apply", command=self.apply_filters).pack(side="left", padx=4)
 
+        # Historical balances
+        self.asof_enabled = tk.BooleanVar(value=False)
+        self.asof_var = tk.StringVar(value=date.today().isoformat())
+        ttk.Checkbutton(bar, text="As of:", variable=self.asof_enabled, command=self.load_data).pack(side="left", padx=(12, 2))
+        make_date_triple(bar, self.asof_var).pack(side="left")
+        self.asof_var.trace_add("write", lambda *_: self.load_data() if self.asof_enabled.get() else None)
+
         # Accounts table
         cols = ("Name", "Type", "Balance")
         self.tree = ttk.Treeview(self, columns=cols, show="headings", selectmode="browse")
@@ -57,48 +85,91 @@ class AccountsTab(ttk.Frame):
         ttk.Button(buttons, text="Delete", command=self.delete_selected).pack(side="left", padx=4)
         ttk.Button(buttons, text="Refresh", command=self.load_data).pack(side="left", padx=4)
 
+    @instrumented
     def load_data(self):
-        """Load accounts from database."""
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-        self._item_ids.clear()
-
-        accounts = self.session.query(Account).all()
-        for acc in accounts:
-            item_id = self.tree.insert("", "end", values=[acc.name, acc.type, f"{float(acc.balance):,.2f}"])
-            self._item_ids[item_id] = acc.id
+        """Load accounts (with their balances as of the selected date) on the background worker."""
+        as_of = self._as_of()
+        if not self.view.rows:
+            self.empty_label.config(text="Loading...")
+            self.empty_label.place(relx=0.5, rely=0.5, anchor="center")
+        self.main_window.worker.submit("accounts.load", lambda session: self._account_rows(session, as_of),
+                                       lambda rows: self._on_rows_loaded(rows, as_of), self._on_load_failed)
+
+    def _on_rows_loaded(self, rows, as_of):
+        self.tree.heading("Balance", text=f"Balance as of {as_of.isoformat()}" if as_of else "Balance")
+        self.view.set_rows(rows)
+        items = self.view.populate(self.tree, lambda acc: [acc.name, acc.type, format_cents(acc.balance)])
+        self._item_ids = {item_id: acc.id for item_id, acc in items.items()}
+        self.apply_filters()
+
+    def _on_load_failed(self, error):
+        self.empty_label.config(text=f"Failed to load accounts: {error}")
+        self.empty_label.place(relx=0.5, rely=0.5, anchor="center")
+
+    def _as_of(self):
+        """Date chosen in the "As of" selector, or None for current balances."""
+        if not self.asof_enabled.get():
+            return None
+        try:
+            return date.fromisoformat(self.asof_var.get())
+        except ValueError:
+            return None
+
+    @staticmethod
+    def _account_rows(session, as_of, ids=None):
+        """AccountRows (all of them, or those with the given ids); runs on the worker."""
+        stmt = select(Account.id, Account.name, Account.type, Account.balance)
+        if ids is not None:
+            stmt = stmt.where(Account.id.in_(ids))
+        rows = []
+        for acc in session.execute(stmt):
+            balance = balance_as_of(session, acc.id, as_of) if as_of else to_cents(acc.balance)
+            rows.append(AccountRow(acc.id, acc.name, acc.type, balance))
+        return rows
+
+    @instrumented
+    def _on_accounts_changed(self, event):
+        """Patch only the accounts named in the event; created/updated rows are read on the worker."""
+        if event.action == "deleted":
+            self._changed_ids.difference_update(event.ids)
+            self._patch_rows([], event.ids)
+            return
+        # A newer change supersedes a read in flight, so it reads every account still waiting
+        self._changed_ids.update(event.ids)
+        ids, as_of = set(self._changed_ids), self._as_of()
+        self.main_window.worker.submit("accounts.changed", lambda session: self._account_rows(session, as_of, ids),
+                                       lambda rows: self._on_changed_loaded(rows, ids), self._on_load_failed)
+
+    def _on_changed_loaded(self, rows, ids):
+        # Skip accounts deleted while their rows were being read
+        self._patch_rows([acc for acc in rows if acc.id in self._changed_ids], ())
+        self._changed_ids.difference_update(ids)
+
+    def _patch_rows(self, changed, removed):
+        self.view.patch(changed, removed)
+        self._item_ids = {item_id: acc.id for item_id, acc in self.view.items().items()}
         self.apply_filters()
-        self.refresh_sum()
-        self._update_empty_state()
 
     def apply_filters(self):
         """Apply filters to account list."""
+        self._search_input.cancel()
         type_filter = self.type_var.get()
-        search_filter = self.search_var.get().lower().strip()
 
-        for item_id in self.tree.get_children():
-            values = self.tree.item(item_id, "values")
-            name = values[0].lower()
-            acc_type = values[1]
+        self.view.filter(lambda acc: type_filter == "All" or acc.type == type_filter, self.search_var.get())
+        self.view.show(self.tree)
 
-            if type_filter != "All" and acc_type != type_filter:
-                self.tree.detach(item_id)
-                continue
-
-            if search_filter and search_filter not in name:
-                self.tree.detach(item_id)
-                continue
+        self.refresh_sum()
+        self._update_empty_state()
 
-            if item_id not in self.tree.get_children():
-                self.tree.reattach(item_id, "", "end")
+    def apply_search(self):
+        """Apply only the search box, refining the previous result when the query was extended."""
+        self.view.refine(self.search_var.get())
+        self.view.show(self.tree)
 
         self.refresh_sum()
         self._update_empty_state()
 
     # helpers
-    def _dollar_ok(self, text: str) -> bool:
-        return bool(re.fullmatch(r"\$?\d+(\.\d{1,2})?", text.strip()))
-
     def _selected(self):
         sel = self.tree.selection()
         return sel[0] if sel else None
@@ -109,18 +180,13 @@ class AccountsTab(ttk.Frame):
 
     def refresh_sum(self):
         """Refreshes the sum if there is a change to the data"""
-        total = 0.0
-        for i in self.tree.get_children():
-            vals = self.tree.item(i, "values")
-            try:
-                total += float(vals[2].replace("$", "").replace(",", ""))
-            except Exception:
-                pass
-        self.sum_label.config(text=f"Total Balance: ${total:,.2f}")
+        total = total_cents(acc.balance for acc in self.view.visible)
+        self.sum_label.config(text=f"Total Balance: {format_cents(total, symbol=True)}")
 
     def _update_empty_state(self):
         """Show or hide empty state message based on treeview content."""
-        if len(self.tree.get_children()) == 0:
+        if not self.view.visible:
+            self.empty_label.config(text="No accounts found")
             self.empty_label.place(relx=0.5, rely=0.5, anchor="center")
         else:
             self.empty_label.place_forget()
@@ -149,16 +215,15 @@ class AccountsTab(ttk.Frame):
                 messagebox.showerror("Invalid Name", "Account name is required.")
                 return
             amt_text = balance_var.get().strip()
-            if not self._dollar_ok(amt_text):
+            if not is_amount(amt_text):
                 messagebox.showerror("Invalid Amount", "Enter a valid dollar amount (e.g., 10 or 10.50).")
                 return
 
             try:
-                account = Account(name=name_var.get().strip(), type=type_var.get(), balance=float(amt_text.replace("$", "")))
+                account = Account(name=name_var.get().strip(), type=type_var.get(), balance=from_cents(parse_cents(amt_text)))
                 self.session.add(account)
                 self.session.commit()
-                self.load_data()
-                self.main_window.refresh_all_tabs()
+                self.main_window.events.publish("account", "created", [account.id])
                 d.destroy()
             except IntegrityError:
                 self.session.rollback()
@@ -183,7 +248,7 @@ class AccountsTab(ttk.Frame):
         if not acc_id:
             return
 
-        account = self.session.query(Account).filter_by(id=acc_id).first()
+        account = self.session.get(Account, acc_id)
         if not account:
             return
 
@@ -195,7 +260,7 @@ class AccountsTab(ttk.Frame):
         d.resizable(False, False)
         name_var = tk.StringVar(value=item_vals[0])
         type_var = tk.StringVar(value=item_vals[1])
-        balance_var = tk.StringVar(value=str(item_vals[2]))
+        balance_var = tk.StringVar(value=format_cents(to_cents(account.balance)))  # Current balance, even when viewing "as of"
 
         def row(r, label, widget):
             ttk.Label(d, text=label).grid(row=r, column=0, sticky="e", padx=6, pady=4)
@@ -210,24 +275,24 @@ class AccountsTab(ttk.Frame):
                 messagebox.showerror("Invalid Name", "Account name is required.")
                 return
             amt_text = balance_var.get().strip()
-            if not self._dollar_ok(amt_text):
+            if not is_amount(amt_text):
                 messagebox.showerror("Invalid Amount", "Enter a valid dollar amount (e.g., 10 or 10.50).")
                 return
 
             try:
                 # Checks for conflicts
                 if name_var.get().strip() != account.name:
-                    existing = self.session.query(Account).filter_by(name=name_var.get().strip()).first()
-                    if existing:
+                    if name_var.get().strip() in reference_data(self.session).account_ids:
                         messagebox.showerror("Error", "An account with this name already exists.")
                         return
 
                 account.name = name_var.get().strip()
                 account.type = type_var.get()
-                account.balance = float(amt_text.replace("$", "").replace(",", ""))
+                account.balance = from_cents(parse_cents(amt_text))
+                # A manual balance shifts the whole history, so every checkpoint is stale
+                invalidate_checkpoints(self.session, account.id)
                 self.session.commit()
-                self.load_data()
-                self.main_window.refresh_all_tabs()
+                self.main_window.events.publish("account", "updated", [acc_id])
                 d.destroy()
             except Exception as e:
                 self.session.rollback()
@@ -249,23 +314,26 @@ class AccountsTab(ttk.Frame):
         if not acc_id:
             return
 
-        account = self.session.query(Account).filter_by(id=acc_id).first()
+        account = self.session.get(Account, acc_id)
         if not account:
             return
 
         transaction_count = self.session.query(Transaction).filter_by(account_id=acc_id).count()
+        rule_count = self.session.query(RecurringRule).filter_by(account_id=acc_id).count()
 
-        if transaction_count > 0:
+        if transaction_count > 0 or rule_count > 0:
             messagebox.showerror(
-                "Cannot Delete",f"This account is used by {transaction_count} transaction(s). " "Please delete or update them first.")
+                "Cannot Delete",f"This account is used by {transaction_count} transaction(s) and {rule_count} recurring rule(s). " "Please delete or update them first.")
             return
 
         if messagebox.askyesno("Confirm Delete", f"Delete account '{account.name}'?"):
             try:
+                # SQLite reuses the id, so nothing keyed by it may outlive the account
+                invalidate_checkpoints(self.session, acc_id)
+                drop_account_rollups(self.session, acc_id)
                 self.session.delete(account)
                 self.session.commit()
-                self.load_data()
-                self.main_window.refresh_all_tabs()
+                self.main_window.events.publish("account", "deleted", [acc_id])
             except Exception as e:
                 self.session.rollback()
                 messagebox.showerror("Error", f"Failed to delete account: {str(e)}")
\ No newline at end of file
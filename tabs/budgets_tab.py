@@ -1,9 +1,14 @@
 import tkinter as tk
-from tkinter import ttk, messagebox
-from datetime import date, datetime
-import re
+from tkinter import ttk, messagebox, filedialog
+from datetime import datetime
 from sqlalchemy.exc import IntegrityError
-from db.models import Category, Transaction, Budget
+from db.models import Budget
+from utils import EXPORT_FILETYPES
+from db.queries import TransactionFilter, month_range, budget_rows
+from db.exporter import export_file
+from db.instrument import instrumented
+from db.reference import reference_data
+from db.money import is_amount, parse_cents, from_cents, format_cents
 
 
 class BudgetsTab(ttk.Frame):
@@ -16,6 +21,10 @@ class BudgetsTab(ttk.Frame):
         self._build_ui()
         self.load_data()
 
+        # Spend, targets and category names all come from the single budget query
+        for entity in ("transaction", "budget", "category"):
+            main_window.events.subscribe(entity, lambda e: main_window.notify(self, self.load_data))
+
     def _build_ui(self):
         """Builds the UI with all of the elements"""
         bar = ttk.Frame(self)
@@ -50,52 +59,61 @@ class BudgetsTab(ttk.Frame):
         ttk.Button(buttons, text="Add", command=self.add_budget).pack(side="left")
         ttk.Button(buttons, text="Delete", command=self.delete_selected).pack(side="left", padx=4)
         ttk.Button(buttons, text="Refresh", command=self.load_data).pack(side="left", padx=4)
+        ttk.Button(buttons, text="Export...", command=self.export_budgets).pack(side="left", padx=4)
         self.tree.bind("<Double-1>", self._edit_target_cell)
 
+    @instrumented
     def load_data(self):
-        """Load budgets for selected month/year and calculate spent/remaining."""
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-        self._item_ids.clear()
-
+        """Load budgets for selected month/year on the background worker."""
         try:
             month = int(self.month_var.get())
             year = int(self.year_var.get())
         except:
             return
 
-        # Budget for selected month/year
-        budgets = self.session.query(Budget).filter(Budget.month == month, Budget.year == year).all()
+        self.empty_label.config(text="Loading...")
+        self.empty_label.place(relx=0.5, rely=0.5, anchor="center")
+        self.main_window.worker.submit("budgets.load", lambda session: budget_rows(session, year, month), self._on_rows_loaded, self._on_load_failed)
 
-        start_date = date(year, month, 1)
-        if month == 12:
-            end_date = date(year + 1, 1, 1)
-        else:
-            end_date = date(year, month + 1, 1)
-
-        for budget in budgets:
-            category = self.session.query(Category).filter_by(id=budget.category_id).first()
-            if not category:
-                continue
-
-            # Only does this for the posted transactions (not planned)
-            transactions = self.session.query(Transaction).filter(
-                Transaction.category_id == budget.category_id,
-                Transaction.date >= start_date,
-                Transaction.date < end_date,
-                Transaction.planned == False
-            ).all()
-
-            spent = sum(float(t.amount) for t in transactions)
-            target = float(budget.target_amount)
+    def _on_rows_loaded(self, rows):
+        """Show budgets with their spent/remaining amounts."""
+        for item in self.tree.get_children():
+            self.tree.delete(item)
+        self._item_ids.clear()
+
+        # Budgets for selected month/year with posted (not planned) spend per category
+        for budget in rows:
+            spent = budget.spent_cents
+            target = budget.target_cents
             remaining = target - spent
             status = "Over" if remaining < 0 else "OK"
 
-            item_id = self.tree.insert("", "end", values=[category.name, f"{target:,.2f}", f"{spent:,.2f}", f"{remaining:,.2f}", status])
+            item_id = self.tree.insert("", "end", values=[budget.category_name, format_cents(target), format_cents(spent), format_cents(remaining), status])
             self._item_ids[item_id] = budget.id
-        
+
         self._update_empty_state()
 
+    def export_budgets(self):
+        """Export the selected month's budgets with their spend to CSV or JSON Lines in the background."""
+        try:
+            start_date, end_date = month_range(int(self.year_var.get()), int(self.month_var.get()))
+        except ValueError:
+            return
+        path = filedialog.asksaveasfilename(parent=self, title="Export Budgets", defaultextension=".csv",
+                                            filetypes=EXPORT_FILETYPES)
+        if not path:
+            return
+        flt = TransactionFilter(start_date, end_date)
+        self.main_window.worker.submit(
+            "budgets.export",
+            lambda session: export_file(session, "budgets", path, flt),
+            lambda count: messagebox.showinfo("Export", f"Exported {count} budget(s) to {path}."),
+            lambda e: messagebox.showerror("Error", f"Failed to export budgets: {e}"))
+
+    def _on_load_failed(self, error):
+        self.empty_label.config(text=f"Failed to load budgets: {error}")
+        self.empty_label.place(relx=0.5, rely=0.5, anchor="center")
+
     def _edit_target_cell(self, event):
         """Edit a cell in the treeview"""
         sel = self.tree.selection()
@@ -113,7 +131,7 @@ class BudgetsTab(ttk.Frame):
 
         def save_edit(e=None):
             val = entry.get().strip()
-            if not re.fullmatch(r"\$?\d+(\.\d{1,2})?", val):
+            if not is_amount(val):
                 entry.destroy()
                 return
 
@@ -128,12 +146,11 @@ class BudgetsTab(ttk.Frame):
                     entry.destroy()
                     return
 
-                target = float(val.replace("$", "").replace(",", ""))
+                target = from_cents(parse_cents(val))
                 budget.target_amount = target
                 self.session.commit()
 
-                self.load_data()
-                self.main_window.update_status_bar()
+                self.main_window.events.publish("budget", "updated", [budget_id])
                 entry.destroy()
             except Exception as e:
                 self.session.rollback()
@@ -146,14 +163,15 @@ class BudgetsTab(ttk.Frame):
     def _update_empty_state(self):
         """Show or hide empty state message based on treeview content."""
         if len(self.tree.get_children()) == 0:
+            self.empty_label.config(text="No budgets found for this month")
             self.empty_label.place(relx=0.5, rely=0.5, anchor="center")
         else:
             self.empty_label.place_forget()
 
     def add_budget(self):
         """Add a new budget."""
-        categories = self.session.query(Category).all()
-        if not categories:
+        category_names = list(reference_data(self.session).category_ids)
+        if not category_names:
             messagebox.showinfo("No Categories", "Please create categories first.")
             return
 
@@ -177,7 +195,6 @@ class BudgetsTab(ttk.Frame):
             ttk.Label(d, text=label).grid(row=r, column=0, sticky="e", padx=6, pady=4)
             widget.grid(row=r, column=1, sticky="w", padx=6, pady=4)
 
-        category_names = [cat.name for cat in categories]
         row(0, "Category", ttk.Combobox(d, textvariable=category_var, values=category_names, width=18, state="readonly"))
         row(1, "Target ($)", ttk.Entry(d, textvariable=target_var, width=12))
 
@@ -187,30 +204,29 @@ class BudgetsTab(ttk.Frame):
                 return
 
             target_text = target_var.get().strip()
-            if not re.fullmatch(r"\$?\d+(\.\d{1,2})?", target_text):
+            if not is_amount(target_text):
                 messagebox.showerror("Error", "Enter a valid dollar amount.")
                 return
 
             try:
-                category = self.session.query(Category).filter_by(name=category_var.get().strip()).first()
-                if not category:
+                category_id = reference_data(self.session).category_ids.get(category_var.get().strip())
+                if category_id is None:
                     messagebox.showerror("Error", "Invalid category.")
                     return
 
-                existing = self.session.query(Budget).filter_by(category_id=category.id, month=month, year=year).first()
+                existing = self.session.query(Budget).filter_by(category_id=category_id, month=month, year=year).first()
 
                 if existing:
                     messagebox.showerror("Error", "A budget for this category and month already exists.")
                     return
 
-                target = float(target_text.replace("$", "").replace(",", ""))
-                budget = Budget(category_id=category.id, month=month, year=year, target_amount=target)
+                target = from_cents(parse_cents(target_text))
+                budget = Budget(category_id=category_id, month=month, year=year, target_amount=target)
 
                 self.session.add(budget)
                 self.session.commit()
 
-                self.load_data()
-                self.main_window.update_status_bar()
+                self.main_window.events.publish("budget", "created", [budget.id])
                 d.destroy()
             except IntegrityError:
                 self.session.rollback()
@@ -239,15 +255,14 @@ class BudgetsTab(ttk.Frame):
         if not budget:
             return
 
-        category = self.session.query(Category).filter_by(id=budget.category_id).first()
+        category = reference_data(self.session).categories.get(budget.category_id)
         category_name = category.name if category else "Unknown"
 
         if messagebox.askyesno("Confirm Delete", f"Delete budget for '{category_name}'?"):
             try:
                 self.session.delete(budget)
                 self.session.commit()
-                self.load_data()
-                self.main_window.update_status_bar()
+                self.main_window.events.publish("budget", "deleted", [budget_id])
             except Exception as e:
                 self.session.rollback()
                 messagebox.showerror("Error", f"Failed to delete budget: {str(e)}")
\ No newline at end of file
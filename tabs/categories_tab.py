@@ -1,7 +1,13 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
+from sqlalchemy import select
 from sqlalchemy.exc import IntegrityError
-from db.models import Category, Transaction, Budget
+from utils.view_model import FilterableViewModel
+from utils.scheduler import InputScheduler
+from db.models import Category, Transaction, Budget, RecurringRule
+from db.ledger import invalidate_checkpoints
+from db.instrument import instrumented
+from db.reference import reference_data
 
 
 class CategoriesTab(ttk.Frame):
@@ -11,9 +17,13 @@ class CategoriesTab(ttk.Frame):
         self.main_window = main_window
         self.session = main_window.session
         self._item_ids = {}
+        self._changed_ids = set()  # Categories named in change events whose rows are being read
+        self.view = FilterableViewModel(lambda cat: (cat.name, cat.description), key=lambda cat: cat.id)
         self._build_ui()
         self.load_data()
 
+        main_window.events.subscribe("category", lambda e: main_window.notify(self, lambda: self._on_categories_changed(e)))
+
     def _build_ui(self):
         """Builds the UI using the elements specified below."""
         # Filter bar
@@ -26,7 +36,9 @@ class CategoriesTab(ttk.Frame):
 
         ttk.Label(bar, text="Search:").pack(side="left")
         self.search_var = tk.StringVar()
-        self.search_var.trace_add("write", lambda *_: self.apply_filters())
+        # Keystrokes are debounced into one search pass
+        self._search_input = InputScheduler(self, self.apply_search)
+        self.search_var.trace_add("write", self._search_input.schedule)
         ttk.Entry(bar, textvariable=self.search_var, width=16).pack(side="left", padx=4)
 
         ttk.Button(bar, text="Apply", command=self.apply_filters).pack(side="left", padx=4)
@@ -52,43 +64,70 @@ class CategoriesTab(ttk.Frame):
         ttk.Button(buttons, text="Delete", command=self.delete_selected).pack(side="left", padx=4)
         ttk.Button(buttons, text="Refresh", command=self.load_data).pack(side="left", padx=4)
 
+    @instrumented
     def load_data(self):
-        """Load categories from database."""
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-        self._item_ids.clear()
-
-        categories = self.session.query(Category).all()
-        for cat in categories:
-            item_id = self.tree.insert("", "end", values=[cat.name, cat.type, cat.description or ""])
-            self._item_ids[item_id] = cat.id
+        """Load categories on the background worker."""
+        if not self.view.rows:
+            self.empty_label.config(text="Loading...")
+            self.empty_label.place(relx=0.5, rely=0.5, anchor="center")
+        self.main_window.worker.submit("categories.load", self._category_rows, self._on_rows_loaded,
+                                       self._on_load_failed)
+
+    def _on_rows_loaded(self, rows):
+        self.view.set_rows(rows)
+        items = self.view.populate(self.tree, lambda cat: [cat.name, cat.type, cat.description or ""])
+        self._item_ids = {item_id: cat.id for item_id, cat in items.items()}
+        self.apply_filters()
+
+    def _on_load_failed(self, error):
+        self.empty_label.config(text=f"Failed to load categories: {error}")
+        self.empty_label.place(relx=0.5, rely=0.5, anchor="center")
+
+    @staticmethod
+    def _category_rows(session, ids=None):
+        """Category row tuples (all of them, or those with the given ids); runs on the worker."""
+        stmt = select(Category.id, Category.name, Category.type, Category.description)
+        if ids is not None:
+            stmt = stmt.where(Category.id.in_(ids))
+        return session.execute(stmt).all()
+
+    @instrumented
+    def _on_categories_changed(self, event):
+        """Patch only the categories named in the event; created/updated rows are read on the worker."""
+        if event.action == "deleted":
+            self._changed_ids.difference_update(event.ids)
+            self._patch_rows([], event.ids)
+            return
+        # A newer change supersedes a read in flight, so it reads every category still waiting
+        self._changed_ids.update(event.ids)
+        ids = set(self._changed_ids)
+        self.main_window.worker.submit("categories.changed", lambda session: self._category_rows(session, ids),
+                                       lambda rows: self._on_changed_loaded(rows, ids), self._on_load_failed)
+
+    def _on_changed_loaded(self, rows, ids):
+        # Skip categories deleted while their rows were being read
+        self._patch_rows([cat for cat in rows if cat.id in self._changed_ids], ())
+        self._changed_ids.difference_update(ids)
+
+    def _patch_rows(self, changed, removed):
+        self.view.patch(changed, removed)
+        self._item_ids = {item_id: cat.id for item_id, cat in self.view.items().items()}
         self.apply_filters()
-        self._update_empty_state()
 
     def apply_filters(self):
         """Apply filters to category list."""
+        self._search_input.cancel()
         type_filter = self.type_var.get()
-        search_filter = self.search_var.get().lower().strip()
-
-        for item_id in self.tree.get_children():
-            values = self.tree.item(item_id, "values")
-            name = values[0].lower()
-            desc = (values[2] or "").lower()
-            cat_type = values[1]
 
-            # Type filter
-            if type_filter != "All" and cat_type != type_filter:
-                self.tree.detach(item_id)
-                continue
+        self.view.filter(lambda cat: type_filter == "All" or cat.type == type_filter, self.search_var.get())
+        self.view.show(self.tree)
 
-            # Search filter
-            if search_filter and search_filter not in name and search_filter not in desc:
-                self.tree.detach(item_id)
-                continue
+        self._update_empty_state()
 
-            # Show item
-            if item_id not in self.tree.get_children():
-                self.tree.reattach(item_id, "", "end")
+    def apply_search(self):
+        """Apply only the search box, refining the previous result when the query was extended."""
+        self.view.refine(self.search_var.get())
+        self.view.show(self.tree)
 
         self._update_empty_state()
 
@@ -103,7 +142,8 @@ class CategoriesTab(ttk.Frame):
 
     def _update_empty_state(self):
         """Show or hide empty state message based on treeview content."""
-        if len(self.tree.get_children()) == 0:
+        if not self.view.visible:
+            self.empty_label.config(text="No categories found")
             self.empty_label.place(relx=0.5, rely=0.5, anchor="center")
         else:
             self.empty_label.place_forget()
@@ -136,8 +176,7 @@ class CategoriesTab(ttk.Frame):
                 category = Category(name=name_var.get().strip(), type=type_var.get(), description=description_var.get().strip())
                 self.session.add(category)
                 self.session.commit()
-                self.load_data()
-                self.main_window.refresh_all_tabs()
+                self.main_window.events.publish("category", "created", [category.id])
                 d.destroy()
             except IntegrityError:
                 self.session.rollback()
@@ -162,7 +201,7 @@ class CategoriesTab(ttk.Frame):
         if not cat_id:
             return
 
-        category = self.session.query(Category).filter_by(id=cat_id).first()
+        category = self.session.get(Category, cat_id)
         if not category:
             return
 
@@ -192,17 +231,21 @@ class CategoriesTab(ttk.Frame):
             try:
                 # Check if name changed and if new name conflicts
                 if name_var.get().strip() != category.name:
-                    existing = self.session.query(Category).filter_by(name=name_var.get().strip()).first()
-                    if existing:
+                    if name_var.get().strip() in reference_data(self.session).category_ids:
                         messagebox.showerror("Error", "A category with this name already exists.")
                         return
 
+                # Flipping Income/Expense changes the sign of every posted transaction in this category
+                if type_var.get() != category.type:
+                    account_ids = self.session.execute(select(Transaction.account_id).where(Transaction.category_id == category.id).distinct()).scalars().all()
+                    for account_id in account_ids:
+                        invalidate_checkpoints(self.session, account_id)
+
                 category.name = name_var.get().strip()
                 category.type = type_var.get()
                 category.description = description_var.get().strip()
                 self.session.commit()
-                self.load_data()
-                self.main_window.refresh_all_tabs()
+                self.main_window.events.publish("category", "updated", [cat_id])
                 d.destroy()
             except Exception as e:
                 self.session.rollback()
@@ -224,24 +267,24 @@ class CategoriesTab(ttk.Frame):
         if not cat_id:
             return
 
-        category = self.session.query(Category).filter_by(id=cat_id).first()
+        category = self.session.get(Category, cat_id)
         if not category:
             return
 
-        # Checks if a category is used by transactions or budgets
+        # Checks if a category is used by transactions, budgets or recurring rules
         transaction_count = self.session.query(Transaction).filter_by(category_id=cat_id).count()
         budget_count = self.session.query(Budget).filter_by(category_id=cat_id).count()
+        rule_count = self.session.query(RecurringRule).filter_by(category_id=cat_id).count()
 
-        if transaction_count > 0 or budget_count > 0:
-            messagebox.showerror("Cannot Delete", f"This category is used by {transaction_count} transaction(s) and {budget_count} budget(s). " "Please delete or update them first.")
+        if transaction_count > 0 or budget_count > 0 or rule_count > 0:
+            messagebox.showerror("Cannot Delete", f"This category is used by {transaction_count} transaction(s), {budget_count} budget(s) and {rule_count} recurring rule(s). " "Please delete or update them first.")
             return
 
         if messagebox.askyesno("Confirm Delete", f"Delete category '{category.name}'?"):
             try:
                 self.session.delete(category)
                 self.session.commit()
-                self.load_data()
-                self.main_window.refresh_all_tabs()
+                self.main_window.events.publish("category", "deleted", [cat_id])
             except Exception as e:
                 self.session.rollback()
                 messagebox.showerror("Error", f"Failed to delete category: {str(e)}")
\ No newline at end of file
@@ -1,9 +1,22 @@
 import tkinter as tk
-from tkinter import ttk, messagebox
-from datetime import date, datetime
-import re
-from utils import make_date_triple
-from db.models import Account, Category, Transaction
+from tkinter import ttk, messagebox, filedialog
+from datetime import date, datetime, timedelta
+from utils import make_date_triple, EXPORT_FILETYPES
+from utils.virtual_tree import VirtualTreeview
+from utils.scheduler import InputScheduler
+from db.models import Transaction
+from db.queries import (TransactionFilter, TransactionPager, month_range, quarter_range, year_to_date_range,
+                        search_transactions, signed_total)
+from db.writes import create_transaction, update_transaction, delete_transaction
+from db.importer import import_file
+from db.exporter import export_file
+from db.instrument import instrumented
+from db.money import is_amount, parse_cents, to_cents, from_cents, format_cents
+from db.reference import reference_data
+
+
+# Date ranges the filter bar can show; Month and Quarter follow the month/year selectors
+RANGES = ("Month", "Quarter", "Year to date", "All time", "Custom")
 
 
 class TransactionsTab(ttk.Frame):
@@ -12,17 +25,42 @@ class TransactionsTab(ttk.Frame):
         super().__init__(parent)
         self.main_window = main_window
         self.session = main_window.session
-        self._item_ids = {}  # Map treeview item IDs to transaction IDs
+        # Signed total in cents of every row matching the filter bar, from an aggregate query
+        self.total_cents = 0
+        self._pager = None  # Source of the rows shown, None for full-text matches
         self._build_ui()
         self.load_data()
 
+        # Reload on transaction changes; account/category renames change the displayed names
+        events = main_window.events
+        events.subscribe("transaction", lambda e: main_window.notify(self, lambda: self._on_transactions_changed(e)))
+        events.subscribe("account", lambda e: main_window.notify(self, lambda: self._on_reference_changed(e)))
+        events.subscribe("category", lambda e: main_window.notify(self, lambda: self._on_reference_changed(e)))
+
     def _build_ui(self):
         """Builds the UI based on the specifications defined below"""
         # Filter bar
         bar = ttk.Frame(self)
         bar.pack(fill="x", padx=6, pady=4)
 
-        ttk.Label(bar, text="Month:").pack(side="left")
+        ttk.Label(bar, text="Range:").pack(side="left")
+        self.range_var = tk.StringVar(value="Month")
+        range_combo = ttk.Combobox(bar, textvariable=self.range_var, values=RANGES, width=12, state="readonly")
+        range_combo.pack(side="left", padx=2)
+        range_combo.bind("<<ComboboxSelected>>", lambda e: self._on_range_changed())
+
+        # From/To dates (inclusive), shown in Custom mode
+        self.custom_frame = ttk.Frame(bar)
+        self.from_var = tk.StringVar(value=date.today().replace(day=1).isoformat())
+        self.to_var = tk.StringVar(value=date.today().isoformat())
+        for label, var in (("From:", self.from_var), ("To:", self.to_var)):
+            ttk.Label(self.custom_frame, text=label).pack(side="left")
+            entry = ttk.Entry(self.custom_frame, textvariable=var, width=11)
+            entry.pack(side="left", padx=2)
+            entry.bind("<Return>", lambda e: self.load_data())
+
+        self.month_label = ttk.Label(bar, text="Month:")
+        self.month_label.pack(side="left")
         months = [f"{i:02d}" for i in range(1, 13)]
         self.month_var = tk.StringVar(value=datetime.now().strftime("%m"))
         self.month_var.trace_add("write", lambda *_: self.load_data())
@@ -37,27 +75,38 @@ class TransactionsTab(ttk.Frame):
         self.account_var = tk.StringVar(value="All")
         self.account_combo = ttk.Combobox(bar, textvariable=self.account_var, width=12, state="readonly")
         self.account_combo.pack(side="left", padx=4)
+        self.account_combo.bind("<<ComboboxSelected>>", lambda e: self.apply_filters())
 
         ttk.Label(bar, text="Category:").pack(side="left")
         self.cat_var = tk.StringVar(value="All")
         self.cat_combo = ttk.Combobox(bar, textvariable=self.cat_var, width=12, state="readonly")
         self.cat_combo.pack(side="left", padx=4)
+        self.cat_combo.bind("<<ComboboxSelected>>", lambda e: self.apply_filters())
 
         ttk.Label(bar, text="Search:").pack(side="left")
         self.search_var = tk.StringVar()
-        self.search_var.trace_add("write", lambda *_: self.apply_filters())
+        # Keystrokes are debounced into one query
+        self._search_input = InputScheduler(self, self.apply_search)
+        self.search_var.trace_add("write", self._search_input.schedule)
         ttk.Entry(bar, textvariable=self.search_var, width=16).pack(side="left", padx=4)
+        # Searches payee/note over every month via the full-text index instead of the loaded month
+        self.all_dates_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(bar, text="All dates", variable=self.all_dates_var, command=self.load_data).pack(side="left", padx=2)
 
         ttk.Label(bar, text="Show:").pack(side="left")
         self.show_var = tk.StringVar(value="Both")
-        ttk.Combobox(bar, textvariable=self.show_var, values=["Posted", "Planned", "Both"], width=10, state="readonly").pack(side="left", padx=4)
+        show_combo = ttk.Combobox(bar, textvariable=self.show_var, values=["Posted", "Planned", "Both"], width=10, state="readonly")
+        show_combo.pack(side="left", padx=4)
+        show_combo.bind("<<ComboboxSelected>>", lambda e: self.apply_filters())
 
         ttk.Button(bar, text="Apply", command=self.apply_filters).pack(side="left", padx=4)
         ttk.Button(bar, text="Refresh", command=self.load_data).pack(side="left", padx=4)
 
         # Transactions table
         cols = ("Date", "Account", "Category", "Payee", "Amount", "Note", "Planned?")
-        self.tree = ttk.Treeview(self, columns=cols, show="headings", selectmode="browse")
+        # Only the visible window of rows is kept as Tk items
+        self.table = VirtualTreeview(self, columns=cols, render=self._row_values, key=lambda txn: txn.id)
+        self.tree = self.table.tree
         for c in cols:
             self.tree.heading(c, text=c)
         self.tree.column("Date", width=100)
@@ -68,12 +117,12 @@ class TransactionsTab(ttk.Frame):
         self.tree.column("Note", width=120)
         self.tree.column("Planned?", width=80, anchor="center")
         self.tree.tag_configure("planned", foreground="gray40", font=("Segoe UI", 10, "italic"))
-        self.tree.pack(fill="both", expand=True, padx=6, pady=6)
+        self.table.pack(fill="both", expand=True, padx=6, pady=6)
 
         # Empty state message
         self.empty_label = ttk.Label(self, text="No transactions found", font=("Segoe UI", 11, "italic"), foreground="gray50")
 
-        # Footer sum (computed locally from table rows)
+        # Footer sum (computed by the same query as the rows)
         self.sum_label = ttk.Label(self, text="Sum: $0.00", anchor="e")
         self.sum_label.pack(fill="x", padx=8, pady=(0, 6))
 
@@ -84,167 +133,180 @@ class TransactionsTab(ttk.Frame):
         ttk.Button(buttons, text="Edit", command=self.edit_transaction).pack(side="left", padx=4)
         ttk.Button(buttons, text="Delete", command=self.delete_selected).pack(side="left", padx=4)
         ttk.Button(buttons, text="Refresh", command=self.load_data).pack(side="left", padx=4)
+        ttk.Button(buttons, text="Import...", command=self.import_transactions).pack(side="left", padx=4)
+        ttk.Button(buttons, text="Export...", command=self.export_transactions).pack(side="left", padx=4)
 
+    @instrumented
     def update_dropdowns(self):
-        """Update account and category dropdowns from database."""
-        accounts = self.session.query(Account).all()
-        account_names = ["All"] + [acc.name for acc in accounts]
-        self.account_combo["values"] = account_names
-
-        categories = self.session.query(Category).all()
-        category_names = ["All"] + [cat.name for cat in categories]
-        self.cat_combo["values"] = category_names
-
-    def load_data(self):
-        """Load transactions from database."""
+        """Update account and category dropdowns from the cached reference data."""
+        reference = reference_data(self.session)
+        self.account_combo["values"] = ["All"] + list(reference.account_ids)
+        self.cat_combo["values"] = ["All"] + list(reference.category_ids)
+
+    @instrumented
+    def load_data(self, keep_position=False):
+        """Load the transactions matching the filter bar on the background worker; a newer load supersedes this one.
+
+        The count and footer sum come from one aggregate query and the first page of rows from a keyset query;
+        later pages load as they are scrolled into view. keep_position=True keeps the scroll position and selection
+        (a reload after rows changed); otherwise the new result starts at the top with nothing selected.
+        """
         self.update_dropdowns()
 
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-        self._item_ids.clear()
+        try:
+            flt = self.current_filter()
+        except ValueError:
+            self.main_window.worker.cancel("transactions.load")
+            self.empty_label.config(text="Enter From and To dates as YYYY-MM-DD")
+            self.empty_label.place(relx=0.5, rely=0.5, anchor="center")
+            return
+        if self._searching_all_dates():
+            # Ranked full-text matches across every date, with the other filters applied
+            query = lambda session: search_transactions(session, flt.search, flt=flt)
+            done = lambda rows: self._on_matches_loaded(rows, keep_position)
+        else:
+            pager = TransactionPager(flt)
+            query, done = pager.load, lambda pager: self._on_pager_loaded(pager, keep_position)
+
+        self.empty_label.config(text="Loading...")
+        self.empty_label.place(relx=0.5, rely=0.5, anchor="center")
+        self.main_window.worker.submit("transactions.load", query, done, self._on_load_failed)
+
+    def _on_pager_loaded(self, pager, keep_position):
+        self._pager = pager
+        self.total_cents = pager.total_cents
+        self.table.set_source(pager.count, lambda start, stop: self._fetch_page(pager, start, stop), keep_position)
+        self._show_totals()
+
+    def _fetch_page(self, pager, start, stop):
+        """Rows load() already read, else None while the page is read on the worker (placeholders meanwhile)."""
+        rows = pager.cached(start, stop)
+        if rows is None:
+            # One channel per page parity: the window spans at most two adjacent pages, so a newer request on a
+            # channel is for a page that replaced the older one in view
+            page = start // self.table.page_size
+            self.main_window.worker.submit(
+                f"transactions.page.{page % 2}",
+                lambda session: pager.fetch(session, start, stop),
+                lambda rows: self._on_page_loaded(pager, start, rows),
+                self._on_load_failed)
+        return rows
+
+    def _on_page_loaded(self, pager, start, rows):
+        if pager is self._pager:
+            self.table.deliver(start, rows)
+
+    def _on_matches_loaded(self, rows, keep_position):
+        self._pager = None
+        # At most a few hundred ranked matches: the sum covers the ones shown
+        self.total_cents = signed_total(rows)
+        self.table.set_rows(rows, keep_position)
+        self._show_totals()
+
+    def _on_load_failed(self, error):
+        self.empty_label.config(text=f"Failed to load transactions: {error}")
+        self.empty_label.place(relx=0.5, rely=0.5, anchor="center")
+
+    def _date_range(self):
+        """[start, end) dates of the selected range; (None, None) for all time. Raises ValueError for bad custom dates."""
+        mode = self.range_var.get()
+        if mode == "All time":
+            return None, None
+        if mode == "Year to date":
+            return year_to_date_range()
+        if mode == "Custom":
+            start_date = date.fromisoformat(self.from_var.get().strip())
+            return start_date, date.fromisoformat(self.to_var.get().strip()) + timedelta(days=1)
+        year, month = int(self.year_var.get()), int(self.month_var.get())
+        return quarter_range(year, month) if mode == "Quarter" else month_range(year, month)
+
+    def _on_range_changed(self):
+        if self.range_var.get() == "Custom":
+            self.custom_frame.pack(side="left", padx=2, before=self.month_label)
+        else:
+            self.custom_frame.pack_forget()
+        self.load_data()
 
-        # Get filter values
-        month = int(self.month_var.get())
-        year = int(self.year_var.get())
+    @instrumented
+    def _on_transactions_changed(self, event):
+        """Reload the count, sum and visible page; the scroll position and selection are kept."""
+        self.load_data(keep_position=True)
 
-        # Date range for the month
-        start_date = date(year, month, 1)
-        if month == 12:
-            end_date = date(year + 1, 1, 1)
+    @instrumented
+    def _on_reference_changed(self, event):
+        """Renames change the names shown in every row; other account/category changes only touch the dropdowns."""
+        if event.action == "updated":
+            self.load_data(keep_position=True)
         else:
-            end_date = date(year, month + 1, 1)
-
-        transactions = self.session.query(Transaction).filter(Transaction.date >= start_date, Transaction.date < end_date).order_by(Transaction.date.desc()).all()
-
-        for txn in transactions:
-            account = self.session.query(Account).filter_by(id=txn.account_id).first()
-            category = self.session.query(Category).filter_by(id=txn.category_id).first()
-
-            account_name = account.name if account else "Unknown"
-            category_name = category.name if category else "Unknown"
-
-            item_id = self.tree.insert("", "end",
-                                       values=[
-                                           txn.date.isoformat(),
-                                           account_name,
-                                           category_name,
-                                           txn.payee or "",
-                                           f"{float(txn.amount):,.2f}",
-                                           txn.note or "",
-                                           "Yes" if txn.planned else "No"
-                                       ],
-                                       tags=("planned",) if txn.planned else ())
-            self._item_ids[item_id] = txn.id
-
-        self.apply_filters()
-        self._update_empty_state()
+            self.update_dropdowns()
+
+    def _searching_all_dates(self):
+        """True when rows come ranked from the full-text index rather than from the selected month."""
+        return self.all_dates_var.get() and bool(self.search_var.get().strip())
+
+    def _row_values(self, txn):
+        """Treeview values and tags for a transaction row."""
+        values = [
+            txn.date.isoformat(),
+            txn.account_name or "Unknown",
+            txn.category_name or "Unknown",
+            txn.payee or "",
+            format_cents(txn.amount_cents),
+            txn.note or "",
+            "Yes" if txn.planned else "No"
+        ]
+        return values, ("planned",) if txn.planned else ()
 
     def apply_filters(self):
-        """Apply filters to transaction list."""
-        account_filter = self.account_var.get()
-        category_filter = self.cat_var.get()
-        search_filter = self.search_var.get().lower().strip()
-        show_filter = self.show_var.get()
-
-        for item_id in self.tree.get_children():
-            values = self.tree.item(item_id, "values")
-            account_name = values[1]
-            category_name = values[2]
-            payee = (values[3] or "").lower()
-            note = (values[5] or "").lower()
-            is_planned = values[6] == "Yes"
-
-            # Account filter
-            if account_filter != "All" and account_name != account_filter:
-                self.tree.detach(item_id)
-                continue
-
-            # Category filter
-            if category_filter != "All" and category_name != category_filter:
-                self.tree.detach(item_id)
-                continue
-
-            # Show filter
-            if show_filter == "Posted" and is_planned:
-                self.tree.detach(item_id)
-                continue
-            if show_filter == "Planned" and not is_planned:
-                self.tree.detach(item_id)
-                continue
-
-            # Search filter
-            if search_filter:
-                if (search_filter not in payee and
-                    search_filter not in note and
-                    search_filter not in account_name.lower() and
-                        search_filter not in category_name.lower()):
-                    self.tree.detach(item_id)
-                    continue
-
-            # Show item
-            if item_id not in self.tree.get_children():
-                self.tree.reattach(item_id, "", "end")
+        """Query the transactions matching the filter bar."""
+        self._search_input.cancel()
+        self.load_data()
+
+    def apply_search(self):
+        """Query again with the new search text (called once typing pauses)."""
+        self.load_data()
 
+    def current_filter(self):
+        """The filter bar as a TransactionFilter, for loads and exports.
+
+        Covers the selected date range (every date when searching "All dates"), account, category, show and search
+        text. An "All dates" search matches each word as a prefix through the full-text index, like the grid's
+        search_transactions. Raises ValueError when a custom range has invalid dates.
+        """
+        all_dates = self._searching_all_dates()
+        start_date, end_date = (None, None) if all_dates else self._date_range()
+        account = self.account_var.get()
+        category = self.cat_var.get()
+        show = self.show_var.get()
+        return TransactionFilter(
+            start_date, end_date,
+            None if account == "All" else account,
+            None if category == "All" else category,
+            {"Posted": False, "Planned": True}.get(show),
+            self.search_var.get().strip() or None,
+            all_dates or None,
+        )
+
+    def _show_totals(self):
         self.refresh_sum()
         self._update_empty_state()
 
     # helpers
-    def _dollar_ok(self, text: str) -> bool:
-        return bool(re.fullmatch(r"\$?\d+(\.\d{1,2})?", text.strip()))
-
     def _selected(self):
-        sel = self.tree.selection()
-        return sel[0] if sel else None
-
-    def _get_transaction_id(self, item_id):
-        """Get transaction ID from treeview item ID."""
-        return self._item_ids.get(item_id)
+        """Transaction ID of the selected row."""
+        return self.table.selected_key()
 
     def refresh_sum(self):
-        total = 0.0
-        for i in self.tree.get_children():
-            vals = self.tree.item(i, "values")
-            try:
-                amount = float(vals[4].replace(",", ""))
-                # Get transaction ID and look up category type
-                txn_id = self._get_transaction_id(i)
-                if txn_id:
-                    transaction = self.session.query(Transaction).filter_by(id=txn_id).first()
-                    if transaction:
-                        category = self.session.query(Category).filter_by(id=transaction.category_id).first()
-                        if category:
-                            # Income adds to sum, Expense subtracts from sum
-                            if category.type == "Income":
-                                total += amount
-                            else:  # Expense
-                                total -= amount
-            except Exception:
-                pass
-        self.sum_label.config(text=f"Sum: ${total:,.2f}")
+        self.sum_label.config(text=f"Sum: {format_cents(self.total_cents, symbol=True)}")
 
     def _update_empty_state(self):
         """Show or hide empty state message based on treeview content."""
-        if len(self.tree.get_children()) == 0:
+        if len(self.table) == 0:
+            self.empty_label.config(text="No transactions found")
             self.empty_label.place(relx=0.5, rely=0.5, anchor="center")
         else:
             self.empty_label.place_forget()
 
-    def _update_account_balance(self, account_id, amount, category_id, is_planned):
-        """Update account balance when transaction is posted (not planned)."""
-        if is_planned:
-            return
-
-        account = self.session.query(Account).filter_by(id=account_id).first()
-        category = self.session.query(Category).filter_by(id=category_id).first()
-
-        if account and category:
-            # Income increases balance, Expense decreases balance
-            if category.type == "Income":
-                account.balance = float(account.balance) + amount
-            else:  # Expense
-                account.balance = float(account.balance) - amount
-            self.session.commit()
-
     # Dialogs/actions
     def add_transaction(self):
         """Adds transaction to the treeview and updates database"""
@@ -268,13 +330,12 @@ class TransactionsTab(ttk.Frame):
 
         row(0, "Date", make_date_triple(d, date_var))
 
-        accounts = self.session.query(Account).all()
-        account_names = [acc.name for acc in accounts]
+        reference = reference_data(self.session)
+        account_names = list(reference.account_ids)
         account_combo = ttk.Combobox(d, textvariable=account_var, values=account_names, width=18, state="readonly")
         row(1, "Account", account_combo)
 
-        categories = self.session.query(Category).all()
-        category_names = [cat.name for cat in categories]
+        category_names = list(reference.category_ids)
         category_combo = ttk.Combobox(d, textvariable=category_var, values=category_names, width=18, state="readonly")
         row(2, "Category", category_combo)
 
@@ -292,16 +353,17 @@ class TransactionsTab(ttk.Frame):
                 return
 
             amt_text = amount_var.get().strip()
-            if not self._dollar_ok(amt_text):
+            if not is_amount(amt_text):
                 messagebox.showerror("Invalid Amount", "Enter a valid dollar amount (e.g., 10 or 10.50).")
                 return
 
             try:
                 # Get account and category IDs
-                account = self.session.query(Account).filter_by(name=account_var.get().strip()).first()
-                category = self.session.query(Category).filter_by(name=category_var.get().strip()).first()
+                reference = reference_data(self.session)
+                account_id = reference.account_ids.get(account_var.get().strip())
+                category_id = reference.category_ids.get(category_var.get().strip())
 
-                if not account or not category:
+                if account_id is None or category_id is None:
                     messagebox.showerror("Error", "Invalid account or category.")
                     return
 
@@ -312,19 +374,13 @@ class TransactionsTab(ttk.Frame):
                     messagebox.showerror("Error", "Invalid date format.")
                     return
 
-                amount = float(amt_text.replace("$", ""))
+                amount = from_cents(parse_cents(amt_text))
                 planned = (planned_var.get() == "Yes")
 
-                transaction = Transaction(date=txn_date, account_id=account.id, category_id=category.id, payee=payee_var.get().strip() or None, amount=amount, note=note_var.get().strip() or None, planned=planned)
-
-                self.session.add(transaction)
-                self.session.commit()
-
-                # Update account balance if not planned
-                self._update_account_balance(account.id, amount, category.id, planned)
+                # Row, rollup and account balance are written in a single commit
+                transaction = create_transaction(self.session, date=txn_date, account_id=account_id, category_id=category_id, payee=payee_var.get().strip() or None, amount=amount, note=note_var.get().strip() or None, planned=planned)
 
-                self.load_data()
-                self.main_window.refresh_all_tabs()
+                self.main_window.events.publish("transaction", "created", [transaction.id])
                 d.destroy()
             except Exception as e:
                 self.session.rollback()
@@ -337,21 +393,18 @@ class TransactionsTab(ttk.Frame):
 
     def edit_transaction(self):
         """Handles Editing the transaction and updating the database based on the edit"""
-        sel = self._selected()
-        if not sel:
-            messagebox.showinfo("Edit", "Select a transaction to edit.")
-            return
-
-        txn_id = self._get_transaction_id(sel)
+        txn_id = self._selected()
         if not txn_id:
+            messagebox.showinfo("Edit", "Select a transaction to edit.")
             return
 
         transaction = self.session.query(Transaction).filter_by(id=txn_id).first()
         if not transaction:
             return
 
-        account = self.session.query(Account).filter_by(id=transaction.account_id).first()
-        category = self.session.query(Category).filter_by(id=transaction.category_id).first()
+        reference = reference_data(self.session)
+        account = reference.accounts.get(transaction.account_id)
+        category = reference.categories.get(transaction.category_id)
 
         self.update_dropdowns()
 
@@ -373,13 +426,11 @@ class TransactionsTab(ttk.Frame):
 
         row(0, "Date", make_date_triple(d, date_var))
 
-        accounts = self.session.query(Account).all()
-        account_names = [acc.name for acc in accounts]
+        account_names = list(reference.account_ids)
         account_combo = ttk.Combobox(d, textvariable=account_var, values=account_names, width=20, state="readonly")
         row(1, "Account", account_combo)
 
-        categories = self.session.query(Category).all()
-        category_names = [cat.name for cat in categories]
+        category_names = list(reference.category_ids)
         category_combo = ttk.Combobox(d, textvariable=category_var, values=category_names, width=20, state="readonly")
         row(2, "Category", category_combo)
 
@@ -397,16 +448,17 @@ class TransactionsTab(ttk.Frame):
                 return
 
             amt_text = amount_var.get().strip()
-            if not self._dollar_ok(amt_text):
+            if not is_amount(amt_text):
                 messagebox.showerror("Invalid Amount", "Enter a valid dollar amount (ex: 10, 20, 39.67).")
                 return
 
             try:
                 # Get account and category IDs
-                account = self.session.query(Account).filter_by(name=account_var.get().strip()).first()
-                category = self.session.query(Category).filter_by(name=category_var.get().strip()).first()
+                reference = reference_data(self.session)
+                account_id = reference.account_ids.get(account_var.get().strip())
+                category_id = reference.category_ids.get(category_var.get().strip())
 
-                if not account or not category:
+                if account_id is None or category_id is None:
                     messagebox.showerror("Error", "Invalid account or category.")
                     return
 
@@ -417,37 +469,13 @@ class TransactionsTab(ttk.Frame):
                     messagebox.showerror("Error", "Invalid date format.")
                     return
 
-                amount = float(amt_text.replace("$", ""))
+                amount = from_cents(parse_cents(amt_text))
                 planned = (planned_var.get() == "Yes")
 
-                # Update account balance if status changed
-                old_amount = float(transaction.amount)
-                old_planned = transaction.planned
-                old_account_id = transaction.account_id
-                old_category_id = transaction.category_id
-
-                # Reverse old transaction effect on old account (if it was posted)
-                if not old_planned:
-                    # Reverse: use negative amount to undo the original transaction
-                    self._update_account_balance(old_account_id, -old_amount, old_category_id, False)
-
-                # Update transaction
-                transaction.date = txn_date
-                transaction.account_id = account.id
-                transaction.category_id = category.id
-                transaction.payee = payee_var.get().strip() or None
-                transaction.amount = amount
-                transaction.note = note_var.get().strip() or None
-                transaction.planned = planned
-
-                self.session.commit()
-
-                # Apply new transaction effect on new account (if it's posted)
-                if not planned:
-                    self._update_account_balance(account.id, amount, category.id, False)
-
-                self.load_data()
-                self.main_window.refresh_all_tabs()
+                # Reverses the old balance effect and applies the new one in a single commit
+                update_transaction(self.session, transaction, date=txn_date, account_id=account_id, category_id=category_id, payee=payee_var.get().strip() or None, amount=amount, note=note_var.get().strip() or None, planned=planned)
+
+                self.main_window.events.publish("transaction", "updated", [txn_id])
                 d.destroy()
             except Exception as e:
                 self.session.rollback()
@@ -458,13 +486,83 @@ class TransactionsTab(ttk.Frame):
         ttk.Button(button_frame, text="Save", command=save).pack(side="left", padx=5)
         ttk.Button(button_frame, text="Cancel", command=d.destroy).pack(side="left", padx=5)
 
-    def delete_selected(self):
-        """Handles selected the selected item from the treeview and the database"""
-        selected = self._selected()
-        if not selected:
+    def import_transactions(self):
+        """Import a CSV, OFX/QFX or QIF file in the background. Rows without an account/category use the defaults picked here."""
+        path = filedialog.askopenfilename(parent=self, title="Import Transactions",
+                                          filetypes=[("Transaction files", "*.csv *.ofx *.qfx *.qif"), ("All files", "*.*")])
+        if not path:
+            return
+
+        d = tk.Toplevel(self)
+        d.title("Import Transactions")
+        d.resizable(False, False)
+        account_var = tk.StringVar()
+        category_var = tk.StringVar()
+        income_var = tk.StringVar()
+        reference = reference_data(self.session)
+        category_names = list(reference.category_ids)
+
+        def row(r, label, widget):
+            ttk.Label(d, text=label).grid(row=r, column=0, sticky="e", padx=6, pady=4)
+            widget.grid(row=r, column=1, sticky="w", padx=6, pady=4)
+
+        ttk.Label(d, text=path, wraplength=320).grid(row=0, column=0, columnspan=2, padx=6, pady=(8, 4))
+        row(1, "Default account", ttk.Combobox(d, textvariable=account_var, width=18, state="readonly",
+                                               values=list(reference.account_ids)))
+        row(2, "Default category", ttk.Combobox(d, textvariable=category_var, values=category_names, width=18, state="readonly"))
+        # Statements sign deposits positive; without this they land in the default category too
+        row(3, "Deposits category", ttk.Combobox(d, textvariable=income_var, values=category_names, width=18, state="readonly"))
+
+        def start():
+            options = {"default_account": account_var.get() or None, "default_category": category_var.get() or None,
+                       "income_category": income_var.get() or None}
+            d.destroy()
+            self.empty_label.config(text="Importing...")
+            self.empty_label.place(relx=0.5, rely=0.5, anchor="center")
+            self.main_window.worker.submit(
+                "transactions.import",
+                lambda session: import_file(session, path, **options),
+                self._on_import_done, self._on_import_failed)
+
+        button_frame = ttk.Frame(d)
+        button_frame.grid(row=4, column=0, columnspan=2, pady=8)
+        ttk.Button(button_frame, text="Import", command=start).pack(side="left", padx=5)
+        ttk.Button(button_frame, text="Cancel", command=d.destroy).pack(side="left", padx=5)
+
+    def _on_import_done(self, result):
+        # The import committed on the worker's session; drop balances this session still has cached
+        self.session.expire_all()
+        self.main_window.events.publish("transaction", "created", [])
+        message = (f"Imported {result.imported} transaction(s), skipped {result.duplicates} already imported "
+                   f"and {result.skipped} invalid.")
+        if result.errors:
+            message += "\n\n" + "\n".join(f"Row {line}: {error}" for line, error in result.errors[:10])
+        messagebox.showinfo("Import", message)
+
+    def _on_import_failed(self, error):
+        self._update_empty_state()
+        messagebox.showerror("Error", f"Failed to import transactions: {error}")
+
+    def export_transactions(self):
+        """Export the transactions matching the filter bar to CSV or JSON Lines in the background."""
+        try:
+            flt = self.current_filter()
+        except ValueError:
+            messagebox.showerror("Invalid Date", "Enter From and To dates as YYYY-MM-DD.")
             return
+        path = filedialog.asksaveasfilename(parent=self, title="Export Transactions", defaultextension=".csv",
+                                            filetypes=EXPORT_FILETYPES)
+        if not path:
+            return
+        self.main_window.worker.submit(
+            "transactions.export",
+            lambda session: export_file(session, "transactions", path, flt),
+            lambda count: messagebox.showinfo("Export", f"Exported {count} transaction(s) to {path}."),
+            lambda e: messagebox.showerror("Error", f"Failed to export transactions: {e}"))
 
-        txn_id = self._get_transaction_id(selected)
+    def delete_selected(self):
+        """Handles selected the selected item from the treeview and the database"""
+        txn_id = self._selected()
         if not txn_id:
             return
 
@@ -472,17 +570,13 @@ class TransactionsTab(ttk.Frame):
         if not transaction:
             return
 
-        if messagebox.askyesno("Confirm Delete", "Delete this transaction?"):
+        amount = format_cents(to_cents(transaction.amount), symbol=True)
+        if messagebox.askyesno("Confirm Delete", f"Delete the {transaction.date.isoformat()} transaction "
+                                                 f"'{transaction.payee or ''}' of {amount}?"):
             try:
-                # Update account balance if not planned (reverse the transaction)
-                if not transaction.planned:
-                    # Reverse: use negative amount to undo the original transaction
-                    self._update_account_balance(transaction.account_id, -float(transaction.amount), transaction.category_id, False)
-
-                self.session.delete(transaction)
-                self.session.commit()
-                self.load_data()
-                self.main_window.refresh_all_tabs()
+                # Reverses the balance effect (if posted) in the same commit as the delete
+                delete_transaction(self.session, transaction)
+                self.main_window.events.publish("transaction", "deleted", [txn_id])
             except Exception as e:
                 self.session.rollback()
                 messagebox.showerror("Error", f"Failed to delete transaction: {str(e)}")
\ No newline at end of file
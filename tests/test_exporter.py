@@ -0,0 +1,31 @@
+from datetime import date
+from decimal import Decimal
+import io
+import db
+from db.exporter import export_transactions
+from db.models import Account, Category, Transaction
+from db.queries import TransactionFilter, search_transactions
+
+
+def test_full_text_export_matches_search():
+    # The FTS table comes from init_db's migrations
+    db.use_database(":memory:")
+    db.init_db()
+    session = db.get_session()
+    account, category = Account(name="Checking", type="Checking", balance=0), Category(name="Shopping", type="Expense")
+    session.add_all([account, category])
+    session.flush()
+    session.add_all(Transaction(date=date(2020 + i, 1, 1), account_id=account.id, category_id=category.id,
+                                payee=payee, amount=Decimal("1.00"))
+                    for i, payee in enumerate(["Amazon refund", "Amazon purchase", "Refund desk", "Amazonia refunds"]))
+    session.commit()
+
+    flt = TransactionFilter(search="amaz ref", fulltext=True)
+    out = io.StringIO()
+    assert export_transactions(session, out, flt, fmt="jsonl") == 2
+    assert sorted(row.payee for row in search_transactions(session, flt.search, flt=flt)) == \
+        ["Amazon refund", "Amazonia refunds"]
+    assert "Amazon refund" in out.getvalue() and "Amazonia refunds" in out.getvalue()
+    # A query without words matches nothing, as in search_transactions
+    assert export_transactions(session, io.StringIO(), flt._replace(search="!!")) == 0
+    db.close_session()
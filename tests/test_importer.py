@@ -0,0 +1,123 @@
+from datetime import date
+from decimal import Decimal
+import pytest
+import db
+from db.importer import import_records, transaction_fingerprint, fitid_fingerprint
+from db.models import Account, Category, Transaction, MonthlyRollup
+from db.rollups import rebuild_rollups
+
+
+def _database():
+    """Session on a fresh in-memory database with a $100.00 Checking account, a Groceries and a Salary category."""
+    db.use_database(":memory:")
+    db.init_db()
+    session = db.get_session()
+    session.add_all([Account(name="Checking", type="Checking", balance=Decimal("100.00")),
+                     Category(name="Groceries", type="Expense"), Category(name="Salary", type="Income")])
+    session.commit()
+    return session
+
+
+def _records(count, fail_at=None):
+    """`count` statement rows of -$10.00, raising OSError (a read error) in place of row `fail_at`."""
+    for i in range(1, count + 1):
+        if i == fail_at:
+            raise OSError("read error")
+        yield {"date": f"2025-01-{i:02d}", "payee": f"Shop {i}", "amount": "-10.00"}
+
+
+def _balance(session):
+    session.expire_all()
+    return session.query(Account).one().balance
+
+
+def test_failed_import_then_reimport_keeps_balance():
+    session = _database()
+    with pytest.raises(OSError):
+        import_records(session, _records(5, fail_at=4), default_account="Checking", default_category="Groceries",
+                       chunk_size=2)
+    session.rollback()
+    assert session.query(Transaction).count() == 2  # The first chunk was committed
+    assert _balance(session) == Decimal("80.00")
+
+    result = import_records(session, _records(5), default_account="Checking", default_category="Groceries",
+                            chunk_size=2)
+    assert (result.imported, result.duplicates) == (3, 2)
+    assert _balance(session) == Decimal("50.00")
+    db.close_session()
+
+
+def _import(session, records):
+    return import_records(session, records, default_account="Checking", default_category="Groceries",
+                          income_category="Salary")
+
+
+def _rollups(session):
+    session.expire_all()
+    return sorted((r.year, r.month, r.category_id, r.account_id, r.posted_sum, r.planned_sum, r.count)
+                  for r in session.query(MonthlyRollup).filter(MonthlyRollup.count > 0))
+
+
+def test_reimport_skips_duplicates_and_keeps_identical_rows():
+    session = _database()
+    coffee = {"date": "2025-01-06", "payee": "Coffee", "amount": "-3.50"}
+    statement = [coffee, dict(coffee), {"date": "2025-01-06", "payee": "Bakery", "amount": "-3.50"}]
+
+    # Two coffees on the same day are two transactions, not a duplicate
+    assert _import(session, statement)[:3] == (3, 0, 0)
+    assert _import(session, statement)[:3] == (0, 0, 3)
+    # A later statement with a third identical coffee adds only that one
+    assert _import(session, statement + [dict(coffee)])[:3] == (1, 0, 3)
+
+    account_id = session.query(Account).one().id
+    fingerprints = {fingerprint for fingerprint, in session.query(Transaction.fingerprint).filter_by(payee="Coffee")}
+    assert fingerprints == {transaction_fingerprint(account_id, date(2025, 1, 6), 350, "Coffee", occurrence)
+                            for occurrence in range(3)}
+    assert _balance(session) == Decimal("86.00")
+    db.close_session()
+
+
+def test_fitid_identifies_rows_instead_of_their_content():
+    session = _database()
+    same_content = {"date": "2025-01-06", "payee": "Coffee", "amount": "-3.50"}
+    assert _import(session, [{**same_content, "fitid": "A1"}, {**same_content, "fitid": "A2"}])[:3] == (2, 0, 0)
+
+    # The bank corrected the row it sent as A1: still the same transaction
+    corrected = {"date": "2025-01-07", "payee": "Coffee shop", "amount": "-3.75", "fitid": "A1"}
+    assert _import(session, [corrected, {**same_content, "fitid": "A3"}])[:3] == (1, 0, 1)
+    # The same row without a FITID (e.g. from a CSV export) has a content fingerprint, not the FITID one
+    assert _import(session, [same_content])[:3] == (1, 0, 0)
+
+    account_id = session.query(Account).one().id
+    assert {fingerprint for fingerprint, in session.query(Transaction.fingerprint)} == {
+        fitid_fingerprint(account_id, "A1"), fitid_fingerprint(account_id, "A2"), fitid_fingerprint(account_id, "A3"),
+        transaction_fingerprint(account_id, date(2025, 1, 6), 350, "Coffee"),
+    }
+    db.close_session()
+
+
+def test_import_updates_balance_and_rollups():
+    session = _database()
+    result = _import(session, [
+        {"date": "2025-01-15", "payee": "Employer", "amount": "1500.00"},
+        {"date": "2025-01-20", "payee": "Market", "amount": "-42.10"},
+        {"date": "2025-02-03", "payee": "Market", "amount": "-17.25"},
+        {"date": "2025-02-28", "payee": "Rent", "amount": "-900.00", "planned": "yes"},
+        {"date": "not a date", "payee": "Broken", "amount": "-1.00"},
+    ])
+    assert result[:3] == (4, 1, 0)
+
+    # Income adds, expenses subtract, planned rows leave the balance alone
+    assert _balance(session) == Decimal("1540.65")
+    incremental = _rollups(session)
+    groceries, salary = (session.query(Category).filter_by(name=name).one().id for name in ("Groceries", "Salary"))
+    account_id = session.query(Account).one().id
+    assert incremental == [
+        (2025, 1, groceries, account_id, Decimal("42.10"), Decimal("0.00"), 1),
+        (2025, 1, salary, account_id, Decimal("1500.00"), Decimal("0.00"), 1),
+        (2025, 2, groceries, account_id, Decimal("17.25"), Decimal("900.00"), 2),
+    ]
+    # The incremental rollups match a full recomputation from the transactions
+    rebuild_rollups(session)
+    assert _rollups(session) == incremental
+    db.close_session()
@@ -0,0 +1,50 @@
+from datetime import date
+from decimal import Decimal
+from sqlalchemy.orm import Session
+from db.config import make_engine
+from db.ledger import balance_as_of
+from db.models import Base, Account, Category, BalanceCheckpoint
+from db.writes import create_transaction, update_transaction, delete_transaction
+
+
+def _ledger(session):
+    """A $1000.00 account with one expense in January and February and an income in March, entered as the app does."""
+    account = Account(name="Checking", type="Checking", balance=Decimal("1000.00"))
+    expense, income = Category(name="Groceries", type="Expense"), Category(name="Salary", type="Income")
+    session.add_all([account, expense, income])
+    session.commit()
+    rows = [(date(2025, 1, 10), expense, "100.00"), (date(2025, 2, 10), expense, "50.00"),
+            (date(2025, 3, 10), income, "200.00")]
+    transactions = [create_transaction(session, date=txn_date, account_id=account.id, category_id=category.id,
+                                       payee="Payee", amount=Decimal(amount), planned=False)
+                    for txn_date, category, amount in rows]
+    return account, expense, transactions
+
+
+def _month_ends(session, account_id):
+    return [balance_as_of(session, account_id, day)
+            for day in (date(2024, 12, 31), date(2025, 1, 31), date(2025, 2, 28), date(2025, 3, 31))]
+
+
+def test_balance_as_of_after_back_dated_edit():
+    engine = make_engine(":memory:")
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        account, expense, (january, february, march) = _ledger(session)
+        assert _month_ends(session, account.id) == [100000, 90000, 85000, 105000]
+        assert session.query(BalanceCheckpoint).count() > 0  # Later reads start from these
+
+        # Move February's expense back into January and raise it: every checkpoint from January on is stale
+        update_transaction(session, february, date=date(2025, 1, 5), amount=Decimal("70.00"))
+        assert _month_ends(session, account.id) == [100000, 83000, 83000, 103000]
+
+        # A back-dated entry before the first transaction shifts every later month
+        create_transaction(session, date=date(2024, 12, 15), account_id=account.id, category_id=expense.id,
+                           payee="Payee", amount=Decimal("25.00"), planned=False)
+        assert _month_ends(session, account.id) == [97500, 80500, 80500, 100500]
+        assert balance_as_of(session, account.id, date(2025, 1, 7)) == 90500  # Mid-month: the Jan 5 row only
+
+        delete_transaction(session, january)
+        assert _month_ends(session, account.id) == [97500, 90500, 90500, 110500]
+        session.refresh(account)
+        assert account.balance == Decimal("1105.00")
@@ -0,0 +1,41 @@
+from datetime import date
+from decimal import Decimal
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from db.config import make_engine
+from db.models import Base, Account, Category, Transaction
+from db.queries import TransactionFilter, TransactionPager, month_range
+
+
+def _month_with(rows):
+    """In-memory database holding `rows` transactions in January 2025, spread over several accounts and categories."""
+    engine = make_engine(":memory:")
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        accounts = [Account(name=f"Account {i}", type="Checking", balance=0) for i in range(3)]
+        categories = [Category(name=f"Category {i}", type="Expense" if i else "Income") for i in range(4)]
+        session.add_all(accounts + categories)
+        session.flush()
+        session.add_all(Transaction(date=date(2025, 1, 1 + i % 28), account_id=accounts[i % 3].id,
+                                    category_id=categories[i % 4].id, payee=f"Payee {i}", amount=Decimal("12.34"))
+                        for i in range(rows))
+        session.commit()
+    return engine
+
+
+def _queries_per_load(engine):
+    """Statements run by loading the month the way TransactionsTab does (count, sum and first page)."""
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    with Session(engine) as session:
+        pager = TransactionPager(TransactionFilter(*month_range(2025, 1))).load(session)
+        rows = pager.fetch(session, 0, pager.count)
+    # Names come joined into the rows, not from per-row lookups
+    assert len(rows) == pager.count and all(row.account_name and row.category_name for row in rows)
+    return len(statements)
+
+
+def test_load_query_count_is_constant():
+    # 150 rows still fit in the first page, which the load reads with the count and sum
+    one, many = _queries_per_load(_month_with(1)), _queries_per_load(_month_with(150))
+    assert one == many
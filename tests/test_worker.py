@@ -0,0 +1,45 @@
+import time
+import db
+from utils.worker import QueryWorker
+
+
+class _Widget:
+    """Stands in for the Tk widget: after() callbacks run when pump() is called."""
+
+    def __init__(self):
+        self.scheduled = []
+        self.errors = []
+
+    def after(self, _ms, callback):
+        self.scheduled.append(callback)
+
+    def report_callback_exception(self, exc_type, exc, tb):
+        self.errors.append(exc)
+
+    def pump(self, worker, timeout=5):
+        deadline = time.monotonic() + timeout
+        while not worker.is_idle() and time.monotonic() < deadline:
+            time.sleep(0.005)
+            scheduled, self.scheduled = self.scheduled, []
+            for callback in scheduled:
+                callback()
+
+
+def test_raising_callback_does_not_stop_delivery():
+    db.use_database(":memory:")
+    widget = _Widget()
+    worker = QueryWorker(widget)
+    delivered = []
+
+    def broken(_result):
+        raise RuntimeError("handler bug")
+
+    worker.submit("a", lambda session: 1, broken)
+    widget.pump(worker)
+    worker.submit("b", lambda session: 2, delivered.append)
+    widget.pump(worker)
+    worker.shutdown()
+
+    assert [str(e) for e in widget.errors] == ["handler bug"]
+    assert delivered == [2]
+    assert worker.is_idle()
@@ -3,6 +3,9 @@ from tkinter import ttk
 from datetime import date
 import calendar
 
+# File dialog choices for exports (db.exporter picks the format from the extension)
+EXPORT_FILETYPES = [("CSV", "*.csv"), ("JSON Lines", "*.jsonl"), ("Gzipped CSV", "*.csv.gz"), ("Gzipped JSON Lines", "*.jsonl.gz")]
+
 
 def make_date_triple(parent, text):
     """Helper function that makes it so choosing a date in add or edit transactions is done efficiently with the dropdown."""
@@ -0,0 +1,27 @@
+class InputScheduler:
+    """Coalesces bursts of input (such as keystrokes) into a single callback once input pauses.
+
+    Each schedule() call cancels the pending after() and starts the delay again, so only the last
+    pass of a burst ever runs.
+    """
+
+    def __init__(self, widget, callback, delay=150):
+        self._widget = widget
+        self._callback = callback
+        self._delay = delay
+        self._pending = None
+
+    def schedule(self, *_):
+        """Run the callback after `delay` ms unless more input arrives first (usable as a trace callback)."""
+        self.cancel()
+        self._pending = self._widget.after(self._delay, self._run)
+
+    def cancel(self):
+        """Drop the pending pass, if any."""
+        if self._pending is not None:
+            self._widget.after_cancel(self._pending)
+            self._pending = None
+
+    def _run(self):
+        self._pending = None
+        self._callback()
@@ -0,0 +1,105 @@
+class FilterableViewModel:
+    """Rows for a list view held as Python tuples, filtered in pure Python and pushed to a Treeview in one batch.
+
+    `search_text` maps a row to the strings the search box should match; they are lowercased once when the rows
+    are set, so each filter pass is a plain substring test per row with no Tk round trips.
+    """
+
+    def __init__(self, search_text, key=None):
+        self._search_text = search_text
+        self._key = key  # row -> id, needed for patch()
+        self.rows = []
+        self.visible = []
+        self._keys = []
+        self._visible_index = []
+        self._item_ids = []  # Tk item per row, when the rows were populated into a plain Treeview
+        self._tree = None
+        self._render = None
+        self._predicate = None
+        self._search = ""
+
+    def set_rows(self, rows):
+        """Replace the rows and precompute their lowercase search keys."""
+        self.rows = list(rows)
+        self._keys = [self._search_key(row) for row in self.rows]
+        self._visible_index = list(range(len(self.rows)))
+        self.visible = list(self.rows)
+        self._search = ""
+
+    def _search_key(self, row):
+        # \x00 keeps a query from matching across two fields
+        return "\x00".join((text or "").lower() for text in self._search_text(row))
+
+    def patch(self, changed=(), removed=()):
+        """Apply created/updated rows and removed ids in place, keeping populated Tk items in step.
+
+        Call filter() afterwards to recompute the visible rows.
+        """
+        position = {self._key(row): i for i, row in enumerate(self.rows)}
+        for row in changed:
+            i = position.get(self._key(row))
+            if i is None:
+                position[self._key(row)] = len(self.rows)
+                self.rows.append(row)
+                self._keys.append(self._search_key(row))
+                if self._tree is not None:
+                    self._item_ids.append(self._tree.insert("", "end", values=self._render(row)))
+            else:
+                self.rows[i] = row
+                self._keys[i] = self._search_key(row)
+                if self._tree is not None:
+                    self._tree.item(self._item_ids[i], values=self._render(row))
+
+        drop = {position[key] for key in removed if key in position}
+        if self._tree is not None and drop:
+            self._tree.delete(*[self._item_ids[i] for i in drop])
+        entries = [
+            entry for i, entry in enumerate(zip(self.rows, self._keys, self._item_ids or [None] * len(self.rows)))
+            if i not in drop
+        ]
+        self.rows = [entry[0] for entry in entries]
+        self._keys = [entry[1] for entry in entries]
+        if self._tree is not None:
+            self._item_ids = [entry[2] for entry in entries]
+
+    def filter(self, predicate=None, search=""):
+        """Compute the rows passing predicate(row) whose search key contains `search`."""
+        self._predicate = predicate
+        self._search = search.lower().strip()
+        return self._scan(range(len(self.rows)))
+
+    def refine(self, search):
+        """Change only the search text, keeping the last predicate.
+
+        When the new text contains the previous one (the user kept typing), only the previous result can still
+        match, so just that subset is rescanned.
+        """
+        search = search.lower().strip()
+        candidates = self._visible_index if self._search in search else range(len(self.rows))
+        self._search = search
+        return self._scan(candidates)
+
+    def _scan(self, candidates):
+        predicate, search = self._predicate, self._search
+        self._visible_index = [
+            i for i in candidates
+            if (predicate is None or predicate(self.rows[i])) and (not search or search in self._keys[i])
+        ]
+        self.visible = [self.rows[i] for i in self._visible_index]
+        return self.visible
+
+    def populate(self, tree, render):
+        """Insert one Tk item per row and return {item_id: row}. Items of the previous rows are deleted."""
+        if self._item_ids:
+            tree.delete(*self._item_ids)
+        self._tree, self._render = tree, render
+        self._item_ids = [tree.insert("", "end", values=render(row)) for row in self.rows]
+        return self.items()
+
+    def items(self):
+        """{item_id: row} for the populated Treeview."""
+        return dict(zip(self._item_ids, self.rows))
+
+    def show(self, tree):
+        """Attach exactly the visible rows' items, in order, with a single Tk call."""
+        tree.set_children("", *[self._item_ids[i] for i in self._visible_index])
@@ -0,0 +1,203 @@
+from tkinter import ttk
+
+
+class VirtualTreeview(ttk.Frame):
+    """Treeview that keeps only the visible window of a large result set as Tk items.
+
+    Rows come from a backing source (a row count plus a fetch(start, stop) callable) and are paged in as the
+    user scrolls. The scrollbar is sized to the full row count, and the Tk items are reused as the window moves.
+    A source that loads pages in the background returns None from fetch and hands the rows over with deliver();
+    until then the page's rows show as placeholders.
+    """
+
+    def __init__(self, parent, columns, render, key, overscan=5, page_size=200, placeholder=("Loading...",)):
+        super().__init__(parent)
+        self._render = render  # row -> (values, tags)
+        self._key = key  # row -> stable id, used to keep the selection while scrolling
+        self._overscan = overscan
+        self._page_size = page_size
+        self._placeholder = placeholder  # Values shown for rows whose page has not arrived
+
+        self.tree = ttk.Treeview(self, columns=columns, show="headings", selectmode="browse")
+        self.scrollbar = ttk.Scrollbar(self, orient="vertical", command=self._on_scrollbar)
+        self.tree.grid(row=0, column=0, sticky="nsew")
+        self.scrollbar.grid(row=0, column=1, sticky="ns")
+        self.rowconfigure(0, weight=1)
+        self.columnconfigure(0, weight=1)
+
+        self._count = 0
+        self._fetch = lambda start, stop: []
+        self._pages = {}
+        self._pending = set()  # Pages requested from a background source and not yet delivered
+        self._top = 0
+        self._slots = []  # Tk item ids currently rendered, top to bottom
+        self._slot_rows = {}  # Tk item id -> row
+        self._selected_key = None
+
+        self.tree.bind("<Configure>", lambda e: self._render_window())
+        self.tree.bind("<<TreeviewSelect>>", self._on_select)
+        self.tree.bind("<MouseWheel>", self._on_mousewheel)
+        self.tree.bind("<Button-4>", lambda e: self._scroll_by(-3))
+        self.tree.bind("<Button-5>", lambda e: self._scroll_by(3))
+        self.tree.bind("<Up>", lambda e: self._move_selection(-1))
+        self.tree.bind("<Down>", lambda e: self._move_selection(1))
+        self.tree.bind("<Prior>", lambda e: self._move_selection(-self._visible_count()))
+        self.tree.bind("<Next>", lambda e: self._move_selection(self._visible_count()))
+
+    def __len__(self):
+        return self._count
+
+    @property
+    def page_size(self):
+        """Rows per fetch(start, stop) call; every start is a multiple of it."""
+        return self._page_size
+
+    # Data source
+    def set_source(self, count, fetch, keep_position=False):
+        """Show `count` rows served by fetch(start, stop), which is only called for pages that come into view.
+
+        fetch may return None and pass the rows to deliver(start, rows) later. A new result starts at the top with
+        nothing selected. keep_position=True keeps the scroll position and selection, for reloading the same result
+        after its rows changed.
+        """
+        self._count = count
+        self._fetch = fetch
+        self._pages.clear()
+        self._pending.clear()
+        if keep_position:
+            self._top = min(self._top, self._max_top())
+        else:
+            self._top = 0
+            self._selected_key = None
+        self._render_window()
+
+    def set_rows(self, rows, keep_position=False):
+        """Show an in-memory sequence of rows."""
+        self.set_source(len(rows), lambda start, stop: rows[start:stop], keep_position)
+
+    def row_at(self, index):
+        """Return the row at an absolute index, fetching its page if needed; None while the page is being loaded."""
+        page, offset = divmod(index, self._page_size)
+        if page not in self._pages:
+            if page in self._pending:
+                return None
+            start = page * self._page_size
+            rows = self._fetch(start, min(start + self._page_size, self._count))
+            if rows is None:
+                self._pending.add(page)
+                return None
+            self._pages[page] = rows
+        rows = self._pages[page]
+        return rows[offset] if offset < len(rows) else None
+
+    def deliver(self, start, rows):
+        """Hand over the rows of the page starting at `start` that fetch returned None for, and show them.
+
+        The caller makes sure they belong to the current source.
+        """
+        page = start // self._page_size
+        self._pending.discard(page)
+        self._pages[page] = rows
+        self._render_window()
+
+    def selected_key(self):
+        """Key of the selected row, even if it has been scrolled out of the window."""
+        return self._selected_key
+
+    # Rendering
+    def _row_height(self):
+        style = ttk.Style(self)
+        return int(style.lookup("Treeview", "rowheight") or 20)
+
+    def _visible_count(self):
+        height = self.tree.winfo_height() - self._row_height()  # Minus the heading row
+        return max(1, height // self._row_height())
+
+    def _max_top(self):
+        return max(0, self._count - self._visible_count())
+
+    def _render_window(self):
+        """Fill the Tk items with rows [top, top + visible + overscan) and update the scrollbar."""
+        wanted = min(self._count - self._top, self._visible_count() + self._overscan)
+
+        while len(self._slots) < wanted:
+            self._slots.append(self.tree.insert("", "end"))
+        if len(self._slots) > wanted:
+            self.tree.delete(*self._slots[wanted:])
+            for item_id in self._slots[wanted:]:
+                self._slot_rows.pop(item_id, None)
+            del self._slots[wanted:]
+
+        # Pages that scrolled away before arriving are requested again if they come back
+        self._pending.intersection_update(range(self._top // self._page_size,
+                                                (self._top + wanted) // self._page_size + 1))
+
+        selected = ()
+        for offset, item_id in enumerate(self._slots):
+            row = self.row_at(self._top + offset)
+            if row is None:
+                self.tree.item(item_id, values=self._placeholder, tags=())
+                self._slot_rows.pop(item_id, None)
+                continue
+            values, tags = self._render(row)
+            self.tree.item(item_id, values=values, tags=tags)
+            self._slot_rows[item_id] = row
+            if self._selected_key is not None and self._key(row) == self._selected_key:
+                selected = (item_id,)
+        self.tree.selection_set(selected)
+        self.tree.yview_moveto(0)
+
+        if self._count:
+            self.scrollbar.set(self._top / self._count, min(1.0, (self._top + self._visible_count()) / self._count))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+    # Scrolling
+    def _scroll_to(self, top):
+        top = max(0, min(int(top), self._max_top()))
+        if top != self._top:
+            self._top = top
+            self._render_window()
+
+    def _scroll_by(self, rows):
+        self._scroll_to(self._top + rows)
+        return "break"
+
+    def _on_mousewheel(self, event):
+        return self._scroll_by(-3 if event.delta > 0 else 3)
+
+    def _on_scrollbar(self, action, amount, unit=None):
+        if action == "moveto":
+            self._scroll_to(float(amount) * self._count)
+        elif unit == "pages":
+            self._scroll_by(int(amount) * self._visible_count())
+        else:
+            self._scroll_by(int(amount))
+
+    # Selection
+    def _on_select(self, _event):
+        sel = self.tree.selection()
+        if sel and sel[0] in self._slot_rows:
+            self._selected_key = self._key(self._slot_rows[sel[0]])
+
+    def _move_selection(self, step):
+        """Keyboard navigation across the whole result set, scrolling the window as needed."""
+        if not self._count:
+            return "break"
+        index = self._top
+        sel = self.tree.selection()
+        if sel and sel[0] in self._slots:
+            index = self._top + self._slots.index(sel[0]) + step
+        index = max(0, min(index, self._count - 1))
+
+        if index < self._top:
+            self._top = index
+        elif index >= self._top + self._visible_count():
+            self._top = min(index - self._visible_count() + 1, self._max_top())
+        row = self.row_at(index)
+        if row is not None:
+            self._selected_key = self._key(row)
+        self._render_window()
+        if self.tree.selection():
+            self.tree.focus(self.tree.selection()[0])
+        return "break"
@@ -0,0 +1,88 @@
+import contextvars
+import queue
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from db import SessionLocal
+
+
+class QueryWorker:
+    """Runs read queries on a thread pool so the Tk main loop never waits on SQLite.
+
+    Each query gets the calling thread's own session from SessionLocal. Results are queued and delivered to
+    callbacks on the Tk thread by an after() poll. Loads are grouped by channel (e.g. "transactions.load"):
+    submitting again on a channel cancels the previous load if it has not started and drops its result if it has.
+    """
+
+    def __init__(self, widget, max_workers=2, poll_ms=15):
+        self._widget = widget
+        self._poll_ms = poll_ms
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="query")
+        self._results = queue.Queue()
+        self._generations = {}  # channel -> generation of the latest submit
+        self._futures = {}  # channel -> future of the latest submit
+        self._polling = False
+
+    def submit(self, channel, query, on_done, on_error=None):
+        """Run query(session) in the background and call on_done(result) (or on_error(exc)) on the Tk thread."""
+        generation = self._generations.get(channel, 0) + 1
+        self._generations[channel] = generation
+        previous = self._futures.get(channel)
+        if previous is not None:
+            previous.cancel()
+        # Run in a copy of the caller's context, so query instrumentation credits the submitting operation
+        context = contextvars.copy_context()
+        self._futures[channel] = self._executor.submit(context.run, self._run, channel, generation, query, on_done, on_error)
+        if not self._polling:
+            self._polling = True
+            self._widget.after(self._poll_ms, self._poll)
+
+    def cancel(self, channel):
+        """Forget any load in flight on a channel."""
+        self._generations[channel] = self._generations.get(channel, 0) + 1
+        future = self._futures.pop(channel, None)
+        if future is not None:
+            future.cancel()
+
+    def is_idle(self):
+        """True when no load is queued or running and every result has been delivered."""
+        return not self._polling
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _is_current(self, channel, generation):
+        return self._generations.get(channel) == generation
+
+    def _run(self, channel, generation, query, on_done, on_error):
+        """Worker thread: skip superseded loads, otherwise query with this thread's session."""
+        if not self._is_current(channel, generation):
+            return
+        session = SessionLocal()
+        try:
+            self._results.put((channel, generation, on_done, query(session)))
+        except Exception as e:
+            self._results.put((channel, generation, on_error, e))
+        finally:
+            SessionLocal.remove()
+
+    def _poll(self):
+        """Tk thread: deliver finished results that are still current.
+
+        A callback that raises is reported like any Tk callback error; polling carries on for the other results.
+        """
+        try:
+            while True:
+                try:
+                    channel, generation, callback, result = self._results.get_nowait()
+                except queue.Empty:
+                    break
+                if callback is not None and self._is_current(channel, generation):
+                    try:
+                        callback(result)
+                    except Exception:
+                        self._widget.report_callback_exception(*sys.exc_info())
+        finally:
+            if any(not future.done() for future in self._futures.values()) or not self._results.empty():
+                self._widget.after(self._poll_ms, self._poll)
+            else:
+                self._polling = False